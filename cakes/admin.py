@@ -1,14 +1,50 @@
-from django.contrib import admin
-from .models import Cake, Customer, Order, OrderItem
+from django import forms
+from django.contrib import admin, messages
+from .exports import export_response
+from .images import refresh_variants
+from .models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    Cake,
+    Customer,
+    DailySales,
+    Order,
+    OrderItem,
+    OutboundEmail,
+    SlotCapacity,
+    SlotOccupancy,
+)
+from .order_status import (
+    STATUS_LABELS,
+    TARGET_STATUSES,
+    bulk_transition,
+    can_transition,
+    queue_status_emails,
+)
+from .paginators import EstimatedCountPaginator
+from .search import exclude_allergens, parse_query, search_cakes
 
 
 @admin.register(Cake)
 class CakeAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'price', 'is_available', 'created_at']
     list_filter = ['category', 'is_available', 'created_at']
-    search_fields = ['name', 'description']
+    search_fields = ['name', 'description', 'ingredients', 'allergens']
     list_editable = ['is_available', 'price']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Same full-text index as /search/ rather than icontains scans
+        if not search_term:
+            return queryset, False
+        text, excluded = parse_query(search_term)
+        queryset = exclude_allergens(search_cakes(queryset, text), excluded)
+        return queryset, False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            refresh_variants(obj)
+
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
@@ -16,17 +52,114 @@ class CustomerAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email', 'phone_number']
 
 
+class OrderItemInline(admin.TabularInline):
+    # Line items are a record of what was ordered at what price
+    model = OrderItem
+    fields = ['cake_name', 'quantity', 'cake_price', 'total_price']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class OrderAdminForm(forms.ModelForm):
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        current = self.instance.status if self.instance.pk else None
+        if current and status != current and not can_transition(
+                current, status):
+            raise forms.ValidationError(
+                f"An order can't go from {STATUS_LABELS[current]} to "
+                f"{STATUS_LABELS[status]}.")
+        return status
+
+
+def status_action(status):
+    """Admin action moving the selected orders to ``status``"""
+    label = STATUS_LABELS[status]
+
+    def action(modeladmin, request, queryset):
+        moved, skipped = bulk_transition(queryset, status)
+        if moved:
+            modeladmin.message_user(
+                request,
+                f'{len(moved)} order(s) marked as {label}, customers will '
+                f'be emailed.',
+                messages.SUCCESS)
+        if skipped:
+            numbers = ', '.join(order.order_number for order in skipped[:10])
+            if len(skipped) > 10:
+                numbers += f' and {len(skipped) - 10} more'
+            modeladmin.message_user(
+                request,
+                f"{len(skipped)} order(s) can't move to {label} from their "
+                f"current status: {numbers}",
+                messages.WARNING)
+
+    action.__name__ = f'mark_{status}'
+    return admin.action(description=f'Mark selected orders as {label}')(
+        action)
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = [
         'order_number',
         'customer',
+        'order_type',
+        'items_summary',
         'total',
         'status',
         'created_at']
     list_filter = ['status', 'order_type', 'created_at']
     search_fields = ['order_number', 'customer__username', 'customer_email']
-    readonly_fields = ['order_number', 'created_at']
+    readonly_fields = ['order_number', 'item_count', 'created_at']
+    raw_id_fields = ['customer']
+    inlines = [OrderItemInline]
+    form = OrderAdminForm
+    # One UPDATE and one batch of emails per action, see cakes.order_status
+    actions = [
+        'export_csv',
+        'export_jsonl',
+        *(status_action(status) for status in TARGET_STATUSES),
+    ]
+
+    # Built for hundreds of thousands of orders: customers joined in,
+    # items prefetched per page and no exact COUNT(*) on big results
+    list_select_related = ['customer']
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('items')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            queue_status_emails([obj])
+
+    @admin.display(description='Items')
+    def items_summary(self, obj):
+        return ', '.join(
+            f"{item.quantity} x {item.cake_name}" for item in obj.items.all()
+        )
+
+    # Streamed, so "select all" on years of orders is fine. Use the date
+    # and status filters to pick the range.
+    @admin.action(description='Export selected orders as CSV')
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv')
+
+    @admin.action(description='Export selected orders as JSON lines')
+    def export_jsonl(self, request, queryset):
+        return export_response(queryset, 'jsonl')
 
 
 @admin.register(OrderItem)
@@ -38,3 +171,97 @@ class OrderItemAdmin(admin.ModelAdmin):
         'cake_price',
         'total_price']
     list_filter = ['order__status']
+    raw_id_fields = ['order', 'cake']
+    # Order.__str__ shows the customer
+    list_select_related = ['order__customer']
+    date_hierarchy = 'order__created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    fields = ['cake_name', 'quantity', 'cake_price', 'total_price']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    # Filled by the archive_orders command, see cakes.archive
+    list_display = [
+        'order_number',
+        'customer',
+        'order_type',
+        'total',
+        'status',
+        'created_at',
+        'archived_at']
+    list_filter = ['status', 'order_type', 'created_at']
+    search_fields = ['order_number', 'customer__username', 'customer_email']
+    inlines = [ArchivedOrderItemInline]
+    actions = ['export_csv', 'export_jsonl']
+
+    list_select_related = ['customer']
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Export selected orders as CSV')
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv')
+
+    @admin.action(description='Export selected orders as JSON lines')
+    def export_jsonl(self, request, queryset):
+        return export_response(queryset, 'jsonl')
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = [
+        'subject',
+        'recipients',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+
+
+@admin.register(SlotCapacity)
+class SlotCapacityAdmin(admin.ModelAdmin):
+    list_display = ['order_type', 'slot', 'capacity']
+    list_editable = ['capacity']
+    list_filter = ['order_type']
+
+
+@admin.register(SlotOccupancy)
+class SlotOccupancyAdmin(admin.ModelAdmin):
+    # Maintained from the orders, see cakes.slots
+    list_display = ['date', 'order_type', 'slot', 'reserved']
+    list_filter = ['order_type', 'slot']
+    date_hierarchy = 'date'
+    readonly_fields = ['order_type', 'date', 'slot', 'reserved']
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    # Maintained from the orders, see cakes.rollups
+    list_display = [
+        'date', 'cake_name', 'category', 'order_type', 'orders', 'quantity',
+        'revenue']
+    list_filter = ['category', 'order_type']
+    date_hierarchy = 'date'
+    readonly_fields = list_display
@@ -2,4 +2,15 @@ from django.apps import AppConfig
 
 class CakesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'cakes'
\ No newline at end of file
+    name = 'cakes'
+
+    def ready(self):
+        from django.core import checks
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .assets import check_vendor_assets
+        from .metrics import install_query_wrapper
+
+        connection_created.connect(install_query_wrapper)
+        checks.register(check_vendor_assets, checks.Tags.staticfiles)
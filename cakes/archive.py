@@ -0,0 +1,88 @@
+"""
+Order archive.
+
+Completed and cancelled orders older than ``ORDER_ARCHIVE_AFTER_DAYS``
+are moved out of Order/OrderItem into ArchivedOrder/ArchivedOrderItem by
+the ``archive_orders`` command, so the tables the shop writes to and the
+indexes behind every order page stay the size of the recent orders.
+
+* Each batch is one transaction: the rows are copied with their ids and
+  then deleted, so an order is always in exactly one of the two tables.
+  Orders locked by a staff edit are skipped and archived on the next run.
+* The deletes are plain SQL. The Order signals would take the orders out
+  of the sales rollup and free their slots, but archived orders still
+  count as sold and their days are long past.
+* The customer pages look in the archive when an order isn't live (see
+  ``cakes.order_queries``) and the sales rollup rebuild includes it.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+ARCHIVED_STATUSES = ('completed', 'cancelled')
+
+
+def archive_cutoff(days):
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_orders(cutoff):
+    """Orders created before ``cutoff`` that are finished with"""
+    return Order.objects.filter(
+        status__in=ARCHIVED_STATUSES, created_at__lt=cutoff)
+
+
+def _copy(instance, model, **extra):
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+    }
+    return model(**values, **extra)
+
+
+def _delete(model, column, pks):
+    placeholders = ', '.join(['%s'] * len(pks))
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE '
+            f'{connection.ops.quote_name(column)} IN ({placeholders})',
+            pks)
+
+
+def archive_batch(cutoff, batch_size=500):
+    """Move up to ``batch_size`` orders into the archive, oldest first"""
+    with transaction.atomic():
+        orders = list(
+            archivable_orders(cutoff)
+            .select_for_update(skip_locked=True)
+            .order_by('created_at', 'id')[:batch_size]
+        )
+        if not orders:
+            return 0
+        pks = [order.pk for order in orders]
+        items = OrderItem.objects.filter(order_id__in=pks)
+
+        now = timezone.now()
+        ArchivedOrder.objects.bulk_create(
+            [_copy(order, ArchivedOrder, archived_at=now)
+             for order in orders])
+        ArchivedOrderItem.objects.bulk_create(
+            [_copy(item, ArchivedOrderItem) for item in items])
+
+        _delete(OrderItem, 'order_id', pks)
+        _delete(Order, 'id', pks)
+    return len(orders)
+
+
+def archive_orders(cutoff, batch_size=500):
+    """Archive every order eligible at ``cutoff`` and return how many"""
+    archived = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            return archived
+        archived += moved
@@ -0,0 +1,493 @@
+"""
+Self-hosted front-end assets.
+
+Bootstrap and Font Awesome used to come from two CDNs, so first paint
+waited on three origins and on CSS the site mostly doesn't use. The
+``build_assets`` command now:
+
+* downloads the pinned upstream files once into ``assets/vendor/`` (kept
+  in git, not served), checking their SRI hashes where we have them;
+* writes a subset of each stylesheet into ``static/vendor/``, keeping
+  only the rules whose classes appear in our templates, scripts and
+  forms, and only the Font Awesome fonts the icons need (as WOFF2);
+* writes ``static/critical/home.css``, the rules needed above the fold on
+  the home page, which ``home.html`` inlines before loading the rest.
+
+``collectstatic`` then hashes, minifies and precompresses everything (see
+``cakes.storage``). Until the build output is committed, the templates
+fall back to the CDN copies (see ``cakes.templatetags.assets``) and the
+``cakes.W001`` system check warns about it outside DEBUG.
+"""
+import gzip
+import hashlib
+import posixpath
+import re
+import shutil
+import urllib.request
+from base64 import b64encode
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.checks import Warning
+from django.template import engines
+from django.template.loader import get_template
+
+BOOTSTRAP_CDN = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/'
+FONTAWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/'
+
+VendorAsset = namedtuple(
+    'VendorAsset', ['source', 'url', 'integrity', 'path', 'purge'])
+
+VENDOR_ASSETS = {
+    'bootstrap-css': VendorAsset(
+        source='bootstrap-5.3.2.min.css',
+        url=BOOTSTRAP_CDN + 'css/bootstrap.min.css',
+        integrity='sha384-T3c6CoIi6uLrA9TneNEoa7RxnatzjcDSCmG1MXxSR1GAsXEV'
+                  '/Dwwykc2MPK8M2HN',
+        path='vendor/bootstrap/bootstrap.min.css',
+        purge=True,
+    ),
+    'bootstrap-js': VendorAsset(
+        source='bootstrap-5.3.2.bundle.min.js',
+        url=BOOTSTRAP_CDN + 'js/bootstrap.bundle.min.js',
+        integrity='sha384-C6RzsynM9kWDrMNeT87bh95OGNyZPhcTNXj1NW7RuBCsyN'
+                  '/o0jlpcV8Qyq46cDfL',
+        path='vendor/bootstrap/bootstrap.bundle.min.js',
+        purge=False,
+    ),
+    'fontawesome-css': VendorAsset(
+        source='fontawesome-6.4.0.min.css',
+        url=FONTAWESOME_CDN + 'css/all.min.css',
+        integrity=None,
+        path='vendor/fontawesome/css/fontawesome.min.css',
+        purge=True,
+    ),
+    'fa-solid': VendorAsset(
+        source='fa-solid-900.woff2',
+        url=FONTAWESOME_CDN + 'webfonts/fa-solid-900.woff2',
+        integrity=None,
+        path='vendor/fontawesome/webfonts/fa-solid-900.woff2',
+        purge=False,
+    ),
+    'fa-brands': VendorAsset(
+        source='fa-brands-400.woff2',
+        url=FONTAWESOME_CDN + 'webfonts/fa-brands-400.woff2',
+        integrity=None,
+        path='vendor/fontawesome/webfonts/fa-brands-400.woff2',
+        purge=False,
+    ),
+}
+
+# Classes Bootstrap's JavaScript adds at runtime, so they never appear in
+# the templates
+SAFELIST = {
+    'active', 'collapse', 'collapsing', 'disabled', 'dropdown-menu-end',
+    'fade', 'hiding', 'is-invalid', 'is-valid', 'modal-backdrop',
+    'modal-open', 'modal-static', 'show', 'showing', 'was-validated',
+}
+
+CRITICAL_PAGES = {'home': 'cakes/home.html'}
+
+NESTED_AT_RULES = ('@media', '@supports', '@container', '@layer')
+CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+NOT_RE = re.compile(r':not\([^()]*\)')
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+TOKEN_RE = re.compile(r'[\w-]+')
+WOFF2_RE = re.compile(r'url\(([^)]*\.woff2)\)')
+URL_RE = re.compile(r'''url\(\s*(['"]?)([^'"()]*)\1\s*\)''')
+DARK_THEME = '[data-bs-theme=dark]'
+
+Rule = namedtuple('Rule', ['selector', 'body'])
+Block = namedtuple('Block', ['prelude', 'children'])
+Statement = namedtuple('Statement', ['text'])
+
+
+def check_vendor_assets(app_configs=None, **kwargs):
+    """
+    System check: outside DEBUG, warn while pages still load Bootstrap and
+    Font Awesome from the CDNs because the build output isn't committed
+    """
+    if settings.DEBUG:
+        return []
+    missing = [
+        asset.path for asset in VENDOR_ASSETS.values()
+        if not finders.find(asset.path)
+    ]
+    missing += [
+        f'critical/{page}.css' for page in CRITICAL_PAGES
+        if not finders.find(f'critical/{page}.css')
+    ]
+    if not missing:
+        return []
+    return [Warning(
+        f'Self-hosted assets are missing ({", ".join(missing)}), so pages '
+        f'load Bootstrap and Font Awesome from the CDNs',
+        hint='Run `python manage.py build_assets --download` and commit '
+             'assets/ and static/.',
+        id='cakes.W001',
+    )]
+
+
+def source_dir():
+    return Path(settings.BASE_DIR) / 'assets' / 'vendor'
+
+
+def output_dir():
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def sri_hash(content):
+    return 'sha384-' + b64encode(hashlib.sha384(content).digest()).decode()
+
+
+def download(asset):
+    """Fetch ``asset`` into assets/vendor/, checking its SRI hash"""
+    with urllib.request.urlopen(asset.url, timeout=30) as response:
+        content = response.read()
+    if asset.integrity and sri_hash(content) != asset.integrity:
+        raise ValueError(f'{asset.url} does not match its integrity hash')
+    path = source_dir() / asset.source
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+# CSS parsing. Enough of CSS for minified third-party stylesheets and our
+# own style.css: rules, nested @media/@supports blocks and statements.
+
+def _string_end(css, i):
+    quote, i = css[i], i + 1
+    while i < len(css):
+        if css[i] == '\\':
+            i += 2
+        elif css[i] == quote:
+            return i + 1
+        else:
+            i += 1
+    return i
+
+
+def _strip_comments(css):
+    out, i = [], 0
+    while i < len(css):
+        if css[i] in '"\'':
+            end = _string_end(css, i)
+            out.append(css[i:end])
+            i = end
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end < 0 else end + 2
+        else:
+            out.append(css[i])
+            i += 1
+    return ''.join(out)
+
+
+def _compact(text):
+    """Collapse whitespace outside strings and drop it around punctuation"""
+    out, i = [], 0
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            end = _string_end(text, i)
+            out.append(text[i:end])
+            i = end
+        elif char.isspace():
+            while i < len(text) and text[i].isspace():
+                i += 1
+            if out and out[-1][-1:] not in ';:{},' and (
+                    i < len(text) and text[i] not in ';:{},'):
+                out.append(' ')
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).strip()
+
+
+def _block_end(css, i):
+    depth = 1
+    while i < len(css):
+        if css[i] in '"\'':
+            i = _string_end(css, i)
+            continue
+        if css[i] == '{':
+            depth += 1
+        elif css[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return i
+
+
+def _parse_block(css, i):
+    nodes = []
+    while i < len(css):
+        j = i
+        while j < len(css) and css[j] not in '{;}':
+            j = _string_end(css, j) if css[j] in '"\'' else j + 1
+        prelude = ' '.join(css[i:j].split())
+        if j >= len(css):
+            break
+        if css[j] == '}':
+            return nodes, j + 1
+        if css[j] == ';':
+            if prelude:
+                nodes.append(Statement(prelude))
+            i = j + 1
+        elif prelude.startswith(NESTED_AT_RULES):
+            children, i = _parse_block(css, j + 1)
+            nodes.append(Block(prelude, children))
+        else:
+            end = _block_end(css, j + 1)
+            nodes.append(Rule(prelude, css[j + 1:end]))
+            i = end + 1
+    return nodes, i
+
+
+def parse_css(css):
+    return _parse_block(_strip_comments(css), 0)[0]
+
+
+def _split_selectors(selector):
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(selector):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(selector[start:i].strip())
+            start = i + 1
+    parts.append(selector[start:].strip())
+    return parts
+
+
+def render_css(nodes):
+    out = []
+    for node in nodes:
+        if isinstance(node, Statement):
+            out.append(node.text + ';')
+        elif isinstance(node, Block):
+            out.append(f'{node.prelude}{{{render_css(node.children)}}}')
+        else:
+            selector = ','.join(_split_selectors(node.selector))
+            out.append(f'{selector}{{{_compact(node.body)}}}')
+    return ''.join(out)
+
+
+def minify_css(css):
+    return render_css(parse_css(css))
+
+
+def _is_relative(url):
+    return bool(url) and not (
+        urlsplit(url).scheme or url.startswith(('/', '#')))
+
+
+def rewrite_urls(css, rewrite):
+    """``css`` with ``rewrite(url)`` applied to its relative ``url()``s"""
+    def replace(match):
+        quote, url = match.groups()
+        if not _is_relative(url.strip()):
+            return match.group(0)
+        return f'url({quote}{rewrite(url.strip())}{quote})'
+    return URL_RE.sub(replace, css)
+
+
+def rebase_urls(css, source, target):
+    """
+    ``css`` from the static file ``source`` with its relative ``url()``s
+    pointing at the same files from the static file ``target``
+    """
+    def rebase(url):
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        resolved = posixpath.normpath(
+            posixpath.join(posixpath.dirname(source), path))
+        return posixpath.relpath(
+            resolved, posixpath.dirname(target) or '.') + suffix
+    return rewrite_urls(css, rebase)
+
+
+def absolute_urls(css, base_url):
+    """``css`` served from ``base_url`` with absolute ``url()``s, to inline"""
+    return rewrite_urls(css, lambda url: urljoin(base_url, url))
+
+
+# Purging
+
+def _selector_used(selector, used):
+    if DARK_THEME in selector:
+        return False
+    # Dots inside :not() and attribute values aren't classes to look for
+    selector = ATTRIBUTE_RE.sub('', NOT_RE.sub('', selector))
+    return all(name in used for name in CLASS_RE.findall(selector))
+
+
+def _font_face(body, fonts):
+    """
+    ``body`` with only its WOFF2 source, or None if that font isn't one we
+    ship. Every browser we support reads WOFF2.
+    """
+    match = WOFF2_RE.search(body)
+    if fonts is None or not match:
+        return None
+    if match.group(1).strip('\'"').rsplit('/', 1)[-1] not in fonts:
+        return None
+    return re.sub(
+        r'src:[^;}]*', f'src:url({match.group(1)}) format("woff2")', body)
+
+
+def _purge(nodes, used, fonts):
+    kept = []
+    for node in nodes:
+        if isinstance(node, Statement):
+            kept.append(node)
+        elif isinstance(node, Block):
+            children = _purge(node.children, used, fonts)
+            if children:
+                kept.append(Block(node.prelude, children))
+        elif node.selector.startswith('@font-face'):
+            body = _font_face(node.body, fonts)
+            if body:
+                kept.append(Rule(node.selector, body))
+        elif node.selector.startswith('@'):
+            kept.append(node)
+        else:
+            selectors = [
+                selector for selector in _split_selectors(node.selector)
+                if _selector_used(selector, used)
+            ]
+            if selectors:
+                kept.append(Rule(','.join(selectors), node.body))
+    return kept
+
+
+def _drop_unused_keyframes(nodes, text):
+    kept = []
+    for node in nodes:
+        if isinstance(node, Block):
+            node = Block(
+                node.prelude, _drop_unused_keyframes(node.children, text))
+        elif isinstance(node, Rule) and node.selector.startswith(
+                ('@keyframes', '@-webkit-keyframes')):
+            name = node.selector.split()[-1]
+            if not re.search(rf'(?<![\w-]){re.escape(name)}(?![\w-])', text):
+                continue
+        kept.append(node)
+    return kept
+
+
+def purge_css(css, used, fonts=None):
+    """
+    Minified ``css`` without the rules whose classes aren't in ``used``.
+    ``@font-face`` rules are kept only for the file names in ``fonts``.
+    """
+    nodes = _purge(parse_css(css), used, fonts)
+    rules = render_css([
+        node for node in nodes
+        if not (isinstance(node, Rule) and '@keyframes' in node.selector)
+    ])
+    return render_css(_drop_unused_keyframes(nodes, rules))
+
+
+def tokens(text):
+    return set(TOKEN_RE.findall(text))
+
+
+def used_classes():
+    """
+    Every word in the project's templates, scripts and Python code. Too
+    many, but a class can only be used if it's in here.
+    """
+    paths = []
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            paths.extend(Path(directory).rglob('*.html'))
+    for directory in settings.STATICFILES_DIRS:
+        paths.extend(
+            path for path in Path(directory).rglob('*.js')
+            if 'vendor' not in path.parts)
+    cakes = Path(apps.get_app_config('cakes').path)
+    paths.extend(cakes.rglob('*.js'))
+    paths.extend(
+        path for path in cakes.rglob('*.py')
+        if 'migrations' not in path.parts)
+
+    used = set(SAFELIST)
+    for path in paths:
+        used |= tokens(path.read_text(encoding='utf-8', errors='ignore'))
+    return used
+
+
+def above_the_fold(template_name):
+    """
+    The words in the page header (base.html up to its content block) and
+    in the first section of ``template_name``
+    """
+    base = get_template('cakes/base.html').template.source
+    page = get_template(template_name).template.source
+    header = base.split('{% block content %}', 1)[0]
+    content = page.split('{% block content %}', 1)[-1]
+    first_section = content.split('</section>', 1)[0]
+    return tokens(header) | tokens(first_section) | SAFELIST
+
+
+def build():
+    """
+    Write the vendored subsets and critical CSS into static/ and return
+    ``(path, source bytes, output bytes, gzipped bytes)`` for each file.
+    """
+    missing = [
+        asset.source for asset in VENDOR_ASSETS.values()
+        if not (source_dir() / asset.source).exists()
+    ]
+    if missing:
+        raise FileNotFoundError(', '.join(missing))
+
+    used = used_classes()
+    fonts = {
+        asset.source for asset in VENDOR_ASSETS.values()
+        if asset.source.endswith('.woff2')
+    }
+    report = []
+
+    def write(path, content, source_size):
+        target = output_dir() / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        report.append(
+            (path, source_size, len(content), len(gzip.compress(content))))
+
+    for asset in VENDOR_ASSETS.values():
+        source = source_dir() / asset.source
+        if asset.purge:
+            css = source.read_text(encoding='utf-8')
+            write(asset.path, purge_css(css, used, fonts).encode(),
+                  len(css.encode()))
+        else:
+            target = output_dir() / asset.path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+            size = target.stat().st_size
+            report.append((asset.path, size, size, size))
+
+    sources = [VENDOR_ASSETS['bootstrap-css'].path, 'css/style.css']
+    stylesheets = {
+        path: (output_dir() / path).read_text(encoding='utf-8')
+        for path in sources
+    }
+    for page, template_name in CRITICAL_PAGES.items():
+        # Relative url()s are rebased onto critical/, collectstatic then
+        # hashes them and critical_css makes them absolute when inlining
+        path = f'critical/{page}.css'
+        css = '\n'.join(
+            rebase_urls(sheet, source, path)
+            for source, sheet in stylesheets.items())
+        write(path, purge_css(css, above_the_fold(template_name)).encode(),
+              sum(len(sheet.encode()) for sheet in stylesheets.values()))
+    return report
@@ -0,0 +1,134 @@
+"""
+Async versions of the ordering, catalogue and contact views.
+
+Used instead of the matching views in ``cakes.views`` when ``ASYNC_VIEWS``
+is on, which only makes sense under the ASGI (uvicorn worker) deployment.
+Django 4.2's view decorators and lazy ``request.user`` are sync only, so
+CSRF exemption, method checks and conditional GETs are handled here and
+ORM/session work goes through ``sync_to_async``.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.http import HttpResponseForbidden, HttpResponseNotAllowed
+from django.http import Http404
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import views
+from .catalogue import get_available_cakes
+from .conditional import catalogue_etag, catalogue_last_modified
+from .forms import ContactForm
+from .idempotency import idempotent_response
+from .models import Order
+from .order_events import event_stream_response, status_stream
+
+arender = sync_to_async(render)
+
+
+def _load_user(request):
+    # Evaluating the lazy user here means later attribute access, from
+    # templates or OrderTrace, does not hit the database on the event loop
+    return request.user.is_authenticated
+
+
+aload_user = sync_to_async(_load_user)
+
+
+def _conditional_state(request):
+    return catalogue_etag(request), catalogue_last_modified(request)
+
+
+async def _catalogue_page(request, category, template):
+    await aload_user(request)
+
+    etag, last_modified = await sync_to_async(_conditional_state)(request)
+    if etag is not None:
+        etag = f'"{etag}"'
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        return response
+
+    cakes = await sync_to_async(get_available_cakes)(category)
+    response = await arender(request, template, {'cakes': cakes})
+    if etag is not None:
+        response.headers.setdefault('ETag', etag)
+    if timestamp is not None:
+        response.headers.setdefault('Last-Modified', http_date(timestamp))
+    return response
+
+
+async def birthday_cakes(request):
+    """Display birthday cakes from database"""
+    return await _catalogue_page(
+        request, 'birthday', 'cakes/birthday_cakes.html')
+
+
+async def wedding_cakes(request):
+    """Display wedding cakes from database"""
+    return await _catalogue_page(
+        request, 'wedding', 'cakes/wedding_cakes.html')
+
+
+async def vegan_cakes(request):
+    """Display vegan cakes from database"""
+    return await _catalogue_page(request, 'vegan', 'cakes/vegan_cakes.html')
+
+
+async def treats(request):
+    """Display treats from database"""
+    return await _catalogue_page(request, 'treats', 'cakes/treats.html')
+
+
+async def products(request):
+    """Display all products"""
+    return await _catalogue_page(request, None, 'cakes/products.html')
+
+
+async def place_order(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    await aload_user(request)
+
+    # The idempotency key row and the order share a transaction, so the
+    # whole request runs in one worker thread
+    return await sync_to_async(idempotent_response)(
+        request, 'place_order', views.place_order_response)
+
+
+place_order.csrf_exempt = True
+
+
+async def order_events(request, order_number):
+    """Stream the order's status changes as Server-Sent Events"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not await aload_user(request):
+        return HttpResponseForbidden()
+    owned = await Order.objects.filter(
+        order_number=order_number, customer=request.user).aexists()
+    if not owned:
+        raise Http404
+    return event_stream_response(status_stream(order_number))
+
+
+async def contact(request):
+    """Display contact page with form"""
+    await aload_user(request)
+    if request.method == 'POST':
+        form = ContactForm(request.POST)
+        if form.is_valid():
+            try:
+                await sync_to_async(views.queue_contact_emails)(form)
+                messages.success(request, views.CONTACT_SUCCESS_MESSAGE)
+                form = ContactForm()  # Reset form after successful submission
+            except Exception as e:
+                views.logger.error(f"Error queueing contact email: {e}")
+                messages.error(request, views.CONTACT_ERROR_MESSAGE)
+    else:
+        form = ContactForm()
+
+    return await arender(
+        request, 'cakes/contact.html', views.contact_context(form))
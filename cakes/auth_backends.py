@@ -0,0 +1,47 @@
+"""
+Authentication backend that caches the logged in user.
+
+``AuthenticationMiddleware`` loads ``request.user`` through the backend's
+``get_user`` on every request that has a session, which is an
+``auth_user`` SELECT per page view. ``CachedModelBackend`` keeps the user
+in the ``sessions`` cache alias instead (see ``CACHES`` in settings). It
+is only enabled when ``CACHE_URL`` makes that cache shared.
+
+Signals in ``cakes.signals`` drop the cached user whenever the User or
+their Customer profile is saved or deleted, so a password change (which
+changes the session auth hash) takes effect straight away.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+CACHE_KEY_PREFIX = 'auth:user:'
+
+
+def _cache():
+    return caches[getattr(settings, 'USER_CACHE_ALIAS', 'sessions')]
+
+
+def _cache_key(user_id):
+    return f"{CACHE_KEY_PREFIX}{user_id}"
+
+
+def invalidate_user(user_id):
+    _cache().delete(_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user is served from the cache"""
+
+    def get_user(self, user_id):
+        cache = _cache()
+        key = _cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(
+                    key, user,
+                    getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+                )
+        return user
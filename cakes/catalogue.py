@@ -0,0 +1,97 @@
+"""
+Cached catalogue lookups for the category listing views.
+
+Available cakes are cached per category in the ``catalogue`` cache alias
+(see ``CACHES`` in settings). The listing templates vary on the logged in
+user, so the query results are cached rather than the rendered HTML.
+Signals in ``cakes.signals`` invalidate the affected categories whenever a
+Cake is saved or deleted.
+
+The catalogue version used for ETag/Last-Modified headers is built from
+stored data, the ``CatalogueVersion`` change counter and the newest cake,
+so it is the same in every process and after restarts. It is cached in
+the same cache and reset on every invalidation.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import Cake, CatalogueVersion
+
+ALL_CATEGORIES = 'all'
+CACHE_KEY_PREFIX = 'catalogue:cakes:'
+VERSION_KEY = 'catalogue:version'
+
+
+def _cache():
+    return caches[getattr(settings, 'CATALOGUE_CACHE_ALIAS', 'catalogue')]
+
+
+def _cache_key(category):
+    return f"{CACHE_KEY_PREFIX}{category or ALL_CATEGORIES}"
+
+
+def available_cakes_queryset(category=None):
+    """Uncached queryset behind the listing pages"""
+    queryset = Cake.objects.filter(is_available=True)
+    if category:
+        queryset = queryset.filter(category=category)
+    return queryset
+
+
+def get_available_cakes(category=None):
+    """Return available cakes for a category, or all when category is None"""
+    cache = _cache()
+    key = _cache_key(category)
+    cakes = cache.get(key)
+    if cakes is None:
+        cakes = list(available_cakes_queryset(category))
+        cache.set(
+            key, cakes, getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', None))
+    return cakes
+
+
+def invalidate_categories(*categories):
+    """Drop cached listings for the given categories and the full list"""
+    keys = {_cache_key(category) for category in categories if category}
+    keys.add(_cache_key(None))
+    keys.add(VERSION_KEY)
+    _cache().delete_many(list(keys))
+
+
+def record_catalogue_change():
+    """Bump the change counter, inside the transaction changing a cake"""
+    changes = CatalogueVersion.objects.filter(pk=1)
+    update = {'counter': F('counter') + 1, 'changed_at': timezone.now()}
+    if not changes.update(**update):
+        CatalogueVersion.objects.bulk_create(
+            [CatalogueVersion(pk=1)], ignore_conflicts=True)
+        changes.update(**update)
+
+
+def get_catalogue_version():
+    """
+    Return ``(version, last_modified)`` for the whole catalogue.
+
+    The version combines the change counter, bumped whenever a cake is
+    saved or deleted, with the newest ``Cake.created_at``, which also
+    covers cakes added by bulk_create. Unchanged data gives the same
+    value on every dyno and after cache misses.
+    """
+    cache = _cache()
+    state = cache.get(VERSION_KEY)
+    if state is None:
+        changes = CatalogueVersion.objects.filter(pk=1).first()
+        latest = Cake.objects.aggregate(latest=Max('created_at'))['latest']
+        latest_stamp = int(latest.timestamp()) if latest else 0
+        stamps = [
+            stamp for stamp in (changes and changes.changed_at, latest)
+            if stamp
+        ]
+        state = {
+            'version': f"{changes.counter if changes else 0}-{latest_stamp}",
+            'last_modified': max(stamps) if stamps else None,
+        }
+        cache.set(VERSION_KEY, state, None)
+    return state['version'], state['last_modified']
@@ -0,0 +1,74 @@
+"""
+ETag and Last-Modified helpers for ``django.views.decorators.http.condition``.
+
+Pages include the logged in user's name and a CSRF token, so every ETag
+also covers the user and the CSRF cookie. Requests with pending flash
+messages are never answered with a 304, otherwise the messages would be
+lost.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+
+from .catalogue import get_catalogue_version
+from .models import ArchivedOrder, Order
+
+
+def _has_pending_messages(request):
+    return len(get_messages(request)) > 0
+
+
+def _make_etag(request, version):
+    user_key = request.user.pk if request.user.is_authenticated else 'anon'
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    raw = f"{version}:{user_key}:{csrf_cookie}"
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def catalogue_etag(request, *args, **kwargs):
+    if _has_pending_messages(request):
+        return None
+    version, _ = get_catalogue_version()
+    return _make_etag(request, version)
+
+
+def catalogue_last_modified(request, *args, **kwargs):
+    if _has_pending_messages(request):
+        return None
+    _, last_modified = get_catalogue_version()
+    return last_modified
+
+
+def _order_updated_at(request, order_number):
+    if not request.user.is_authenticated:
+        return None
+    # Cached on the request so the ETag and Last-Modified functions share
+    # one lookup
+    cache = request.__dict__.setdefault('_order_updated_at', {})
+    if order_number not in cache:
+        # Falls back to the archive like the order pages themselves
+        for model in (Order, ArchivedOrder):
+            updated_at = model.objects.filter(
+                order_number=order_number,
+                customer=request.user,
+            ).values_list('updated_at', flat=True).first()
+            if updated_at is not None:
+                break
+        cache[order_number] = updated_at
+    return cache[order_number]
+
+
+def order_etag(request, order_number):
+    if _has_pending_messages(request):
+        return None
+    updated_at = _order_updated_at(request, order_number)
+    if updated_at is None:
+        return None
+    return _make_etag(request, updated_at.isoformat())
+
+
+def order_last_modified(request, order_number):
+    if _has_pending_messages(request):
+        return None
+    return _order_updated_at(request, order_number)
@@ -0,0 +1,136 @@
+"""
+PostgreSQL backend that borrows connections from an in-process pool.
+
+Intended for the threaded and ASGI deployments, where many short lived
+Django connections would otherwise each pay a TCP + TLS + auth handshake.
+Closing a Django connection (at the end of every request when
+CONN_MAX_AGE is 0) hands the psycopg2 connection back to the pool instead
+of closing it. When all ``POOL_MAX_SIZE`` connections are out, a new one
+waits up to ``POOL_TIMEOUT`` seconds for one to come back, then fails
+with ``PoolTimeout``. psycopg2 closes connections handed back above
+``POOL_MIN_SIZE``, so that defaults to ``POOL_MAX_SIZE``; all of them are
+opened when the pool is first used.
+
+Enable it with ``DB_POOL_MAX_SIZE`` (see settings). Only psycopg2 is
+supported, matching requirements.txt.
+"""
+import threading
+
+import psycopg2.extras
+from psycopg2 import pool as psycopg2_pool
+from psycopg2.extensions import STATUS_READY
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No pooled connection came free in time"""
+
+
+class BlockingConnectionPool(psycopg2_pool.ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool whose getconn() waits for a free connection
+    instead of raising PoolError straight away
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=30, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        # One permit per connection that can be handed out
+        self._permits = threading.BoundedSemaphore(self.maxconn)
+
+    def getconn(self, key=None):
+        if not self._permits.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'No database connection came free within {self.timeout}s, '
+                f'all {self.maxconn} are in use. Raise DB_POOL_MAX_SIZE or '
+                f'DB_POOL_TIMEOUT.'
+            )
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self._permits.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._permits.release()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            maxconn = settings_dict.get('POOL_MAX_SIZE', 10)
+            pool = BlockingConnectionPool(
+                settings_dict.get('POOL_MIN_SIZE', maxconn),
+                maxconn,
+                timeout=settings_dict.get('POOL_TIMEOUT', 30),
+                **conn_params,
+            )
+            _pools[alias] = pool
+        return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def _pool(self, conn_params=None):
+        return get_pool(
+            self.alias,
+            self.settings_dict,
+            conn_params or self.get_connection_params(),
+        )
+
+    def _is_healthy(self, connection):
+        if connection.closed:
+            return False
+        if not self.settings_dict.get('CONN_HEALTH_CHECKS'):
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        if 'isolation_level' in self.settings_dict['OPTIONS']:
+            raise ImproperlyConfigured(
+                'The pooled PostgreSQL backend only supports the default '
+                'isolation level'
+            )
+        self.isolation_level = IsolationLevel.READ_COMMITTED
+
+        pool = self._pool(conn_params)
+        connection = pool.getconn()
+        if not self._is_healthy(connection):
+            pool.putconn(connection, close=True)
+            connection = pool.getconn()
+
+        # Start clean whatever the previous borrower left behind
+        if connection.status != STATUS_READY:
+            connection.rollback()
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            broken = self.connection.closed
+            if not broken and self.connection.status != STATUS_READY:
+                try:
+                    self.connection.rollback()
+                except psycopg2.Error:
+                    broken = True
+            self._pool().putconn(self.connection, close=broken)
@@ -0,0 +1,112 @@
+"""
+Idempotency keys for the order endpoints.
+
+A client that sends an ``Idempotency-Key`` header can retry an order as
+often as it likes and the order is placed once. The first request inserts
+an ``IdempotencyKey`` row and stores its JSON response in the same
+transaction as the order, so:
+
+* a retry finds the committed row and gets the stored response back, with
+  ``Idempotent-Replayed: true``, without touching Order or the outbox;
+* a concurrent duplicate waits on the row's primary key until the first
+  request commits, then gets its response;
+* a server error rolls the row back along with the order, so the retry
+  is processed normally.
+
+Reusing a key with a different body is a client bug and gets a 422. Keys
+are scoped to the endpoint and user and live for ``IDEMPOTENCY_KEY_TTL``
+seconds.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def _sha256(value):
+    return hashlib.sha256(value).hexdigest()
+
+
+def _claim(key, request_hash):
+    """
+    ``(row, None)`` when this request should run, with ``row`` locked, or
+    ``(None, response)`` when it has already been answered
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                key=key, request_hash=request_hash,
+                expires_at=expires_at), None
+    except IntegrityError:
+        record = IdempotencyKey.objects.select_for_update().get(key=key)
+
+    if record.expires_at <= now:
+        record.request_hash = request_hash
+        record.expires_at = expires_at
+        return record, None
+    if record.request_hash != request_hash:
+        return None, JsonResponse({
+            'success': False,
+            'error': f'{HEADER} was already used for a different request',
+        }, status=422)
+
+    response = JsonResponse(
+        record.response, status=record.status_code, safe=False)
+    response[REPLAYED_HEADER] = 'true'
+    return None, response
+
+
+def idempotent_response(request, scope, handler):
+    """
+    ``handler(request)``, a view returning a JsonResponse, run at most once
+    per ``Idempotency-Key``. Requests without the header run as before.
+    """
+    client_key = request.headers.get(HEADER)
+    if client_key is None:
+        return handler(request)
+    if not client_key or len(client_key) > MAX_KEY_LENGTH:
+        return JsonResponse(
+            {'success': False, 'error': f'Invalid {HEADER}'}, status=400)
+
+    user_id = getattr(request.user, 'pk', None) or ''
+    key = _sha256(f'{scope}:{user_id}:{client_key}'.encode())
+
+    with transaction.atomic():
+        record, response = _claim(key, _sha256(request.body))
+        if response is not None:
+            return response
+
+        response = handler(request)
+        if response.status_code >= 500:
+            transaction.set_rollback(True)
+            return response
+        record.status_code = response.status_code
+        record.response = json.loads(response.content)
+        record.save()
+    return response
+
+
+def purge_expired(batch_size=1000):
+    """Delete expired keys in batches and return how many went"""
+    deleted = 0
+    while True:
+        batch = list(
+            IdempotencyKey.objects
+            .filter(expires_at__lte=timezone.now())
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
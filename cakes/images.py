@@ -0,0 +1,87 @@
+"""
+Responsive image variants for Cake.image.
+
+When a cake image is uploaded, resized copies are saved next to the
+original (``cakes/name_640w.webp``) in every format Pillow can write.
+Their paths are stored on ``Cake.image_variants`` so templates can build a
+``srcset`` without asking the storage backend whether files exist.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from .catalogue import invalidate_categories
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 960)
+
+# Preferred first, browsers pick the first <source> type they support
+VARIANT_FORMATS = [
+    ('avif', 'AVIF', {'quality': 55}),
+    ('webp', 'WEBP', {'quality': 80, 'method': 6}),
+]
+
+
+def supported_formats():
+    return [
+        (extension, pil_format, options)
+        for extension, pil_format, options in VARIANT_FORMATS
+        if features.check(extension)
+    ]
+
+
+def variant_name(original_name, width, extension):
+    root, _ = os.path.splitext(original_name)
+    return f"{root}_{width}w.{extension}"
+
+
+def generate_variants(cake, storage=default_storage):
+    """
+    Create the resized copies of ``cake.image`` and return the mapping
+    ``{extension: {width: storage name}}``. Widths larger than the
+    original are skipped so images are never upscaled.
+    """
+    if not cake.image:
+        return {}
+
+    with cake.image.open('rb') as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    widths = [w for w in VARIANT_WIDTHS if w < image.width] or [image.width]
+    variants = {}
+    for extension, pil_format, options in supported_formats():
+        variants[extension] = {}
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+
+            name = variant_name(cake.image.name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            saved_name = storage.save(name, ContentFile(buffer.getvalue()))
+            variants[extension][str(width)] = saved_name
+    return variants
+
+
+def refresh_variants(cake):
+    """Regenerate variants for a cake and store them on the row"""
+    try:
+        variants = generate_variants(cake)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not create image variants for {cake.pk}: {e}")
+        variants = {}
+    # update() skips post_save, so clear the cached listing ourselves
+    type(cake).objects.filter(pk=cake.pk).update(image_variants=variants)
+    cake.image_variants = variants
+    invalidate_categories(cake.category)
+    return variants
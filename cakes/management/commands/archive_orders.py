@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cakes.archive import archivable_orders, archive_cutoff, archive_orders
+
+
+class Command(BaseCommand):
+    help = (
+        'Move completed and cancelled orders older than '
+        'ORDER_ARCHIVE_AFTER_DAYS into the order archive, in batches. '
+        'Schedule it daily, e.g. with Heroku Scheduler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS,
+            help='Archive orders created more than this many days ago')
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Orders moved per transaction')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only count the orders that would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        cutoff = archive_cutoff(options['days'])
+        if options['dry_run']:
+            count = archivable_orders(cutoff).count()
+            self.stdout.write(f'{count} orders would be archived')
+            return
+
+        archived = archive_orders(cutoff, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Archived {archived} orders created before '
+            f'{cutoff:%Y-%m-%d}'))
@@ -0,0 +1,95 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+POOLED_ALIAS = 'benchmark_pooled'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure per-request database connection overhead with and '
+        'without persistent connections, and with the connection pool on '
+        'PostgreSQL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        original = (
+            settings_dict['CONN_MAX_AGE'],
+            settings_dict.get('CONN_HEALTH_CHECKS', False),
+        )
+        engine = settings_dict['ENGINE'].rsplit('.', 1)[-1]
+        modes = [
+            (f'new connection per request ({engine})', 0, False),
+            ('persistent', 600, False),
+            ('persistent + health checks', 600, True),
+        ]
+
+        try:
+            results = {}
+            for label, max_age, health_checks in modes:
+                connection.close()
+                settings_dict['CONN_MAX_AGE'] = max_age
+                settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                results[label] = self.measure(options['requests'])
+        finally:
+            connection.close()
+            (settings_dict['CONN_MAX_AGE'],
+             settings_dict['CONN_HEALTH_CHECKS']) = original
+
+        if connection.vendor == 'postgresql':
+            results['pooled (DB_POOL_MAX_SIZE=1)'] = self.measure_pooled(
+                options['requests'])
+
+        baseline = next(iter(results.values()))
+        for label, (mean, p95) in results.items():
+            self.stdout.write(
+                f'{label:<40} mean {mean:7.2f}ms  p95 {p95:7.2f}ms  '
+                f'({baseline[0] / mean:4.1f}x)'
+            )
+
+    def measure_pooled(self, requests):
+        """
+        The same request cycle on a copy of the default database using the
+        pooled backend, closed after every request like the ASGI setup
+        """
+        from cakes.db.pooled_postgresql.base import _pools
+
+        connections.settings[POOLED_ALIAS] = {
+            **connection.settings_dict,
+            'ENGINE': 'cakes.db.pooled_postgresql',
+            'CONN_MAX_AGE': 0,
+            'POOL_MIN_SIZE': 1,
+            'POOL_MAX_SIZE': 1,
+        }
+        try:
+            return self.measure(requests, POOLED_ALIAS)
+        finally:
+            connections[POOLED_ALIAS].close()
+            del connections[POOLED_ALIAS]
+            del connections.settings[POOLED_ALIAS]
+            pool = _pools.pop(POOLED_ALIAS, None)
+            if pool is not None:
+                pool.closeall()
+
+    def measure(self, requests, alias=DEFAULT_DB_ALIAS):
+        """Simulate the request cycle around a single cheap query"""
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return (
+            sum(timings) / len(timings),
+            timings[int(len(timings) * 0.95) - 1],
+        )
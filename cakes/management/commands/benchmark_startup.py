@@ -0,0 +1,91 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so every run is a real cold start
+CHILD_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+settings_done = time.perf_counter()
+django.setup()
+setup_done = time.perf_counter()
+from django.test import Client, override_settings
+client = Client()
+with override_settings(ALLOWED_HOSTS=['testserver'],
+                       SECURE_SSL_REDIRECT=False):
+    first = time.perf_counter()
+    status = client.get(sys.argv[1]).status_code
+    first_done = time.perf_counter()
+    client.get(sys.argv[1])
+    second_done = time.perf_counter()
+print(json.dumps({
+    'settings_ms': (settings_done - start) * 1000,
+    'setup_ms': (setup_done - settings_done) * 1000,
+    'first_request_ms': (first_done - first) * 1000,
+    'second_request_ms': (second_done - first_done) * 1000,
+    'status': status,
+}))
+'''
+
+PHASES = [
+    ('settings_ms', 'settings import'),
+    ('setup_ms', 'django.setup()'),
+    ('first_request_ms', 'first request'),
+    ('second_request_ms', 'second request'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure cold start time: settings import, django.setup() and the '
+        'first request, each run in a new Python process'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/',
+                            help='URL requested after setup')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+
+        results = []
+        for _ in range(options['runs']):
+            completed = subprocess.run(
+                [sys.executable, '-c', CHILD_SCRIPT, options['path']],
+                capture_output=True, text=True, cwd=settings.BASE_DIR,
+                env=env,
+            )
+            if completed.returncode != 0:
+                raise CommandError(completed.stderr.strip())
+            # Only the last line is ours, anything before it was printed
+            # during startup and is itself worth fixing
+            lines = completed.stdout.strip().splitlines()
+            if len(lines) > 1:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️ {len(lines) - 1} line(s) printed during startup'))
+            results.append(json.loads(lines[-1]))
+
+        self.stdout.write(
+            f"{options['runs']} runs, GET {options['path']} -> "
+            f"{results[0]['status']}"
+        )
+        for key, label in PHASES:
+            samples = [result[key] for result in results]
+            self.stdout.write(
+                f'{label:<16} median {statistics.median(samples):8.2f}ms  '
+                f'min {min(samples):8.2f}ms  max {max(samples):8.2f}ms'
+            )
+        total = statistics.median(
+            sum(result[key] for key, _ in PHASES[:3]) for result in results)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Cold start to first response: {total:.2f}ms (median)'))
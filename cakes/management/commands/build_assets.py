@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cakes.assets import VENDOR_ASSETS, build, download, source_dir
+
+
+class Command(BaseCommand):
+    help = (
+        'Write the Bootstrap and Font Awesome subsets our templates use and '
+        'the critical CSS for the home page into static/. Run it after '
+        'changing templates and commit the result.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--download', action='store_true',
+            help='Fetch the pinned upstream files into assets/vendor/ first')
+
+    def handle(self, *args, **options):
+        if options['download']:
+            for asset in VENDOR_ASSETS.values():
+                try:
+                    path = download(asset)
+                except (OSError, ValueError) as e:
+                    raise CommandError(f'Could not download {asset.url}: {e}')
+                self.stdout.write(f'Downloaded {path}')
+
+        try:
+            report = build()
+        except FileNotFoundError as e:
+            raise CommandError(
+                f'Missing {e} in {source_dir()}, run with --download')
+
+        for path, source, output, gzipped in report:
+            self.stdout.write(
+                f'{path}: {source / 1024:.1f} KB -> {output / 1024:.1f} KB '
+                f'({gzipped / 1024:.1f} KB gzipped)')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Built {len(report)} assets, now run collectstatic'))
@@ -0,0 +1,156 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from cakes import views
+from cakes.catalogue import available_cakes_queryset, invalidate_categories
+from cakes.models import (
+    ArchivedOrder, ArchivedOrderItem, Cake, Order, OrderItem,
+)
+from cakes.order_numbers import generate_order_number
+from cakes.order_queries import customer_orders
+
+# SQLite reports "SCAN table" for a full table scan and
+# "SCAN table USING INDEX ..." for an index scan
+SQLITE_SEQ_SCAN = re.compile(r'\bSCAN (\w+)\s*$', re.MULTILINE)
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the hot catalogue and order queries and fail on '
+        'sequential scans or view query counts that grow with the data'
+    )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        failures = self.check_plans() + self.check_query_counts()
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(f'❌ {failure}'))
+            raise CommandError(f'{len(failures)} query plan check(s) failed')
+        self.stdout.write(self.style.SUCCESS('✅ All query plans use indexes'))
+
+    def hot_queries(self):
+        user = User(pk=1)
+        return [
+            ('birthday listing', available_cakes_queryset('birthday')),
+            ('products listing', available_cakes_queryset()),
+            ('order history page', customer_orders(user)[:21]),
+            ('order detail', Order.objects.filter(
+                order_number='MC0', customer=user)),
+            ('order items', OrderItem.objects.filter(order_id=1)),
+            ('archived order history page',
+             customer_orders(user, ArchivedOrder)[:21]),
+            ('archived order detail', ArchivedOrder.objects.filter(
+                order_number='MC0', customer=user)),
+            ('archived order items',
+             ArchivedOrderItem.objects.filter(order_id=1)),
+            ('admin orders by status', Order.objects.filter(
+                status='pending').order_by('-created_at')[:100]),
+            ('admin orders by type', Order.objects.filter(
+                order_type='delivery').order_by('-created_at')[:100]),
+            ('admin orders', Order.objects.order_by('-created_at')[:100]),
+        ]
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Small tables are always cheaper to scan, so check that an
+            # index is usable rather than what the planner prefers today
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                return queryset.explain()
+        return queryset.explain()
+
+    def check_plans(self):
+        pattern = (
+            POSTGRES_SEQ_SCAN if connection.vendor == 'postgresql'
+            else SQLITE_SEQ_SCAN
+        )
+        failures = []
+        for label, queryset in self.hot_queries():
+            plan = self.explain(queryset)
+            if self.verbosity > 1:
+                self.stdout.write(f'{label}:\n{plan}\n')
+            for table in pattern.findall(plan):
+                failures.append(f'{label}: sequential scan on {table}')
+        return failures
+
+    def check_query_counts(self):
+        """Render the views with small and larger data and compare"""
+        failures = []
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user('query-plan-check')
+                small = self.count_view_queries(user)
+                self.seed(user, orders=5, items=3)
+                large = self.count_view_queries(user)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            invalidate_categories(*dict(Cake.CATEGORY_CHOICES))
+
+        for label, count in small.items():
+            if large[label] > count:
+                failures.append(
+                    f'{label}: {count} queries grew to {large[label]} '
+                    f'with more rows (N+1?)'
+                )
+            elif self.verbosity > 1:
+                self.stdout.write(f'{label}: {count} queries')
+        return failures
+
+    def seed(self, user, orders, items):
+        cakes = [
+            Cake.objects.create(
+                name=f'Query plan cake {i}', description='-', price=10,
+                category=category)
+            for i, category in enumerate(dict(Cake.CATEGORY_CHOICES))
+        ]
+        for i in range(orders):
+            order = Order.objects.create(
+                customer=user, customer_email='check@example.com',
+                order_number=generate_order_number(), order_type='collection',
+                total=10 * items, item_count=items)
+            OrderItem.objects.bulk_create(
+                OrderItem(
+                    order=order, cake=cakes[n % len(cakes)],
+                    cake_name=cakes[n % len(cakes)].name, cake_price=10,
+                    total_price=10)
+                for n in range(items)
+            )
+
+    def count_view_queries(self, user):
+        invalidate_categories(*dict(Cake.CATEGORY_CHOICES))
+        factory = RequestFactory()
+        latest = customer_orders(user).first()
+        if latest is None:
+            self.seed(user, orders=1, items=1)
+            latest = customer_orders(user).first()
+
+        checks = {
+            'birthday_cakes': (views.birthday_cakes, ()),
+            'products': (views.products, ()),
+            'order_history': (views.order_history, ()),
+            'order_detail': (views.order_detail, (latest.order_number,)),
+            'order_confirmation': (
+                views.order_confirmation, (latest.order_number,)),
+        }
+        counts = {}
+        for label, (view, args) in checks.items():
+            request = factory.get('/')
+            request.user = user
+            with CaptureQueriesContext(connection) as queries:
+                view(request, *args)
+            counts[label] = len(queries)
+        return counts
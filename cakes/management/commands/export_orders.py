@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from cakes.exports import FORMATS, export_lines, filter_orders
+from cakes.models import ArchivedOrder, Order
+
+
+def date_argument(value):
+    date = parse_date(value)
+    if date is None:
+        raise ValueError(value)
+    return date
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream orders with their items to a CSV or JSON lines file. '
+        'Memory use does not grow with the number of orders.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--start', type=date_argument,
+                            help='First order date (YYYY-MM-DD)')
+        parser.add_argument('--end', type=date_argument,
+                            help='Last order date (YYYY-MM-DD)')
+        parser.add_argument(
+            '--status', action='append',
+            choices=[status for status, _ in Order.ORDER_STATUS_CHOICES],
+            help='Only export this status, can be repeated')
+        parser.add_argument('--output', default='-',
+                            help='File to write, - for stdout')
+        parser.add_argument(
+            '--archive', action='store_true',
+            help='Export archived orders (see archive_orders) instead')
+
+    def handle(self, *args, **options):
+        if (options['start'] and options['end']
+                and options['start'] > options['end']):
+            raise CommandError('--start is after --end')
+
+        model = ArchivedOrder if options['archive'] else Order
+        orders = filter_orders(
+            model.objects.all(),
+            options['start'], options['end'], options['status'])
+        lines = export_lines(orders, options['format'])
+
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', newline='') as output:
+            output.writelines(lines)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Orders exported to {options["output"]}'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from cakes.images import refresh_variants
+from cakes.models import Cake
+
+
+class Command(BaseCommand):
+    help = 'Create responsive image variants for cakes that do not have them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate variants for every cake with an image')
+
+    def handle(self, *args, **options):
+        cakes = Cake.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            cakes = cakes.filter(image_variants={})
+
+        done = failed = 0
+        for cake in cakes.iterator():
+            if refresh_variants(cake):
+                done += 1
+                self.stdout.write(f'  • {cake.name}')
+            else:
+                failed += 1
+                self.stdout.write(
+                    self.style.WARNING(f'  • {cake.name} failed'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Created variants for {done} cake(s), {failed} failed'))
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .run_benchmark import LISTING_ENDPOINTS
+from .seed_benchmark_data import BENCH_USER_PREFIX
+
+STRATEGIES = ['db', 'cached_db', 'signed_cookies']
+
+BACKENDS = [
+    ('ModelBackend', 'django.contrib.auth.backends.ModelBackend'),
+    ('CachedModelBackend', 'cakes.auth_backends.CachedModelBackend'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Count SQL queries per listing page for each session strategy and '
+        'authentication backend, for anonymous visitors with a session '
+        'cookie and for logged in users. Run seed_benchmark_data first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5,
+                            help='Warm requests per listing page')
+
+    def handle(self, *args, **options):
+        user = (
+            User.objects.filter(username__startswith=BENCH_USER_PREFIX)
+            .order_by('pk').first()
+        )
+        if user is None:
+            raise CommandError('No benchmark data, run seed_benchmark_data')
+
+        self.stdout.write(
+            f"{'session strategy':<16} {'visitor':<30} queries/page")
+        for strategy in STRATEGIES:
+            engine = f'django.contrib.sessions.backends.{strategy}'
+            with self.settings(SESSION_ENGINE=engine):
+                self.report(strategy, 'anonymous + session',
+                            self.measure(self.anonymous_client(), options))
+            for label, backend in BACKENDS:
+                with self.settings(SESSION_ENGINE=engine,
+                                   AUTHENTICATION_BACKENDS=[backend]):
+                    client = Client()
+                    client.force_login(user)
+                    self.report(strategy, f'logged in ({label})',
+                                self.measure(client, options))
+
+    def settings(self, **overrides):
+        return override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            SECURE_SSL_REDIRECT=False,
+            QUERY_BUDGET_RAISE=False,
+            **overrides,
+        )
+
+    def anonymous_client(self):
+        """A visitor whose session exists but holds no login"""
+        client = Client()
+        session = client.session
+        session['visited'] = True
+        session.save()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        return client
+
+    def measure(self, client, options):
+        counts = []
+        for _, path in LISTING_ENDPOINTS:
+            client.get(path)  # warm the catalogue, session and user caches
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as queries:
+                    client.get(path)
+                counts.append(len(queries))
+        return sum(counts) / len(counts)
+
+    def report(self, strategy, visitor, queries):
+        self.stdout.write(f'{strategy:<16} {visitor:<30} {queries:.2f}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from cakes.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired order idempotency keys. Schedule it hourly, e.g. '
+        'with Heroku Scheduler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Keys deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Deleted {deleted} expired idempotency keys'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from cakes.rollups import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the daily sales rollup from the orders. Run once after '
+        'deploying it, and after loading or bulk editing orders.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date,
+                            help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', type=parse_date,
+                            help='Last day to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollup(options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt {rows} daily sales rows'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from cakes.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Refill the SQLite full-text index from the cakes table, e.g. '
+        'after bulk loading data. PostgreSQL keeps its index up to date.'
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(
+                f'{connection.vendor} keeps the search index up to date, '
+                f'nothing to do')
+            return
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Indexed {count} cakes'))
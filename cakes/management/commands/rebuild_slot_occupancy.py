@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from cakes.slots import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute slot occupancy from the orders, e.g. after loading '
+        'orders with loaddata or editing them with update()'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', type=parse_date,
+            help='First date to rebuild (YYYY-MM-DD), defaults to today')
+
+    def handle(self, *args, **options):
+        rows = rebuild_occupancy(options['since'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt occupancy for {rows} slots'))
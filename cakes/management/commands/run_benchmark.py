@@ -0,0 +1,203 @@
+import json
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from cakes.metrics import registry
+from cakes.models import Cake, Order
+
+from .seed_benchmark_data import BENCH_USER_PREFIX
+
+LISTING_ENDPOINTS = [
+    ('birthday_cakes', '/birthday-cakes/'),
+    ('wedding_cakes', '/wedding-cakes/'),
+    ('vegan_cakes', '/vegan-cakes/'),
+    ('treats', '/treats/'),
+    ('products', '/products/'),
+]
+
+
+def percentile(samples, pct):
+    """Nearest rank percentile of an already sorted list"""
+    if not samples:
+        return None
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[rank]
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the catalogue and order endpoints with concurrent clients '
+        'and write latency, throughput and query counts to a JSON file. '
+        'Run seed_benchmark_data first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--output', default='bench_output.json')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--endpoints', nargs='*',
+            help='Only run these endpoints (URL names)')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.local = threading.local()
+        self.user_ids = list(
+            User.objects.filter(username__startswith=BENCH_USER_PREFIX)
+            .values_list('pk', flat=True)
+        )
+        self.cake_ids = list(
+            Cake.objects.filter(is_available=True)
+            .values_list('pk', flat=True)
+        )
+        if not self.user_ids or not self.cake_ids:
+            raise CommandError('No benchmark data, run seed_benchmark_data')
+
+        scenarios = self.scenarios()
+        if options['endpoints']:
+            scenarios = [s for s in scenarios if s[0] in options['endpoints']]
+
+        results = {}
+        # Keep the benchmark off SMTP and away from the production host and
+        # HTTPS redirect checks, and never let place_order fill its slot
+        with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                ALLOWED_HOSTS=['testserver'],
+                SECURE_SSL_REDIRECT=False,
+                QUERY_BUDGET_RAISE=False,
+                SLOT_DEFAULT_CAPACITY=10 ** 9):
+            for name, make_request in scenarios:
+                results[name] = self.run_scenario(
+                    name, make_request,
+                    options['requests'], options['concurrency'])
+                self.report(name, results[name])
+
+        report = {
+            'meta': {
+                'commit': self.git_commit(),
+                'database': connection.vendor,
+                'requests_per_endpoint': options['requests'],
+                'concurrency': options['concurrency'],
+                'finished_at': timezone.now().isoformat(),
+            },
+            'endpoints': results,
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Results written to {options["output"]}'))
+
+    def scenarios(self):
+        scenarios = [
+            (name, self.get(path)) for name, path in LISTING_ENDPOINTS
+        ]
+        scenarios += [
+            ('order_history', self.get('/orders/')),
+            ('order_detail', self.order_detail),
+            ('place_order', self.place_order),
+        ]
+        return scenarios
+
+    def client(self):
+        """One logged in test client per worker thread"""
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = Client()
+            self.local.user = User.objects.get(
+                pk=self.rng.choice(self.user_ids))
+            client.force_login(self.local.user)
+            self.local.client = client
+        return client
+
+    def get(self, path):
+        return lambda: self.client().get(path)
+
+    def order_detail(self):
+        client = self.client()
+        if not hasattr(self.local, 'order_numbers'):
+            self.local.order_numbers = list(
+                Order.objects.filter(customer=self.local.user)
+                .values_list('order_number', flat=True)[:50]
+            )
+        if not self.local.order_numbers:
+            return client.get('/orders/')
+        return client.get(
+            f'/orders/{self.rng.choice(self.local.order_numbers)}/')
+
+    def place_order(self):
+        client = self.client()
+        return client.post(
+            '/place-order/',
+            json.dumps({
+                'cake_id': self.rng.choice(self.cake_ids),
+                'customer_email': self.local.user.email,
+                'delivery_option': 'collection',
+                'collection_date': '2030-01-01',
+                'collection_time': '8am-12pm',
+            }),
+            content_type='application/json',
+        )
+
+    def run_scenario(self, name, make_request, total, concurrency):
+        registry.reset()
+
+        def timed_request(_):
+            start = time.perf_counter()
+            try:
+                response = make_request()
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed_request, range(total)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(seconds * 1000 for seconds, _ in samples)
+        view_totals = registry.snapshot().get(name, {})
+        recorded = view_totals.get('requests_total', 0)
+        return {
+            'requests': total,
+            'errors': sum(1 for _, ok in samples if not ok),
+            'throughput_rps': round(total / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'queries_per_request': (
+                round(view_totals['sql_queries_total'] / recorded, 2)
+                if recorded else None
+            ),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<16} p50 {result['p50_ms']:>8.2f}ms  "
+            f"p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+            f"{result['throughput_rps']:>8.1f} req/s  "
+            f"{result['queries_per_request']} queries/req  "
+            f"{result['errors']} errors"
+        )
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, cwd=settings.BASE_DIR,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,94 @@
+import random
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cakes.catalogue import invalidate_categories
+from cakes.models import Cake, Order, OrderItem
+from cakes.order_numbers import generate_order_number
+from cakes.search import rebuild_index
+
+BENCH_USER_PREFIX = 'bench-user-'
+
+
+class Command(BaseCommand):
+    help = 'Seed cakes, users and orders for the benchmark suite'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cakes', type=int, default=50,
+                            help='Cakes per category')
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--orders', type=int, default=50,
+                            help='Orders per user')
+        parser.add_argument('--items', type=int, default=2,
+                            help='Items per order')
+        parser.add_argument('--seed', type=int, default=1,
+                            help='Random seed, for reproducible data')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            cakes = Cake.objects.bulk_create(
+                Cake(
+                    name=f'Benchmark {category} cake {i}',
+                    description='Seeded for benchmarking',
+                    price=Decimal(rng.randint(1000, 9000)) / 100,
+                    category=category,
+                    allergens='milk, eggs',
+                )
+                for category in dict(Cake.CATEGORY_CHOICES)
+                for i in range(options['cakes'])
+            )
+            # bulk_create skips the signals that index the cakes for
+            # /search/ and clear the listing cache
+            rebuild_index()
+            transaction.on_commit(
+                lambda: invalidate_categories(*dict(Cake.CATEGORY_CHOICES))
+            )
+
+        existing = User.objects.filter(
+            username__startswith=BENCH_USER_PREFIX
+        ).count()
+        users = []
+        for i in range(existing, existing + options['users']):
+            user = User(
+                username=f'{BENCH_USER_PREFIX}{i}',
+                email=f'{BENCH_USER_PREFIX}{i}@example.com',
+            )
+            user.set_unusable_password()
+            users.append(user)
+        users = User.objects.bulk_create(users)
+
+        for user in users:
+            with transaction.atomic():
+                orders = Order.objects.bulk_create(
+                    Order(
+                        customer=user,
+                        customer_email=user.email,
+                        order_number=generate_order_number(),
+                        order_type=rng.choice(['collection', 'delivery']),
+                        status=rng.choice(
+                            [s for s, _ in Order.ORDER_STATUS_CHOICES]),
+                        total=Decimal('0.00'),
+                        item_count=options['items'],
+                    )
+                    for _ in range(options['orders'])
+                )
+                items = []
+                for order in orders:
+                    for cake in rng.sample(cakes, options['items']):
+                        items.append(OrderItem(
+                            order=order, cake=cake, cake_name=cake.name,
+                            cake_price=cake.price, quantity=1,
+                            total_price=cake.price))
+                        order.total += cake.price
+                OrderItem.objects.bulk_create(items)
+                Order.objects.bulk_update(orders, ['total'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Seeded {len(cakes)} cakes, {len(users)} users and '
+            f'{len(users) * options["orders"]} orders'
+        ))
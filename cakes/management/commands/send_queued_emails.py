@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cakes.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Number of emails to send per SMTP connection')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting when empty')
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to sleep between polls when the outbox is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = drain_outbox(options['batch_size'])
+            except Exception as e:
+                # Connection level failure, nothing was marked as attempted
+                self.stdout.write(self.style.ERROR(f'Outbox error: {e}'))
+                sent = failed = 0
+
+            if sent or failed:
+                self.stdout.write(
+                    f'Sent {sent} email(s), {failed} failed')
+
+            if not options['loop']:
+                if not (sent or failed):
+                    break
+                continue
+            if not (sent or failed):
+                time.sleep(options['interval'])
@@ -0,0 +1,57 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from cakes.order_numbers import generate_order_number
+
+
+def _close_connections():
+    # Forked workers must not share the parent's database connection
+    connections.close_all()
+
+
+def _generate(count):
+    return [generate_order_number() for _ in range(count)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate order numbers from several processes at once and check '
+        'that none collide. Exits non-zero on a duplicate or a number '
+        'lower than the same worker got before.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--count', type=int, default=1000,
+                            help='Order numbers per worker')
+
+    def handle(self, *args, **options):
+        workers, count = options['workers'], options['count']
+        _close_connections()
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(
+                max_workers=workers, initializer=_close_connections) as pool:
+            results = list(pool.map(_generate, [count] * workers))
+        elapsed = time.perf_counter() - start
+
+        numbers = [number for result in results for number in result]
+        duplicates = len(numbers) - len(set(numbers))
+        unordered = sum(
+            1 for result in results
+            for a, b in zip(result, result[1:]) if b <= a
+        )
+
+        self.stdout.write(
+            f'{len(numbers)} order numbers from {workers} processes in '
+            f'{elapsed:.2f}s ({len(numbers) / elapsed:.0f}/s)'
+        )
+        if duplicates or unordered:
+            raise CommandError(
+                f'❌ {duplicates} duplicate(s), {unordered} out of order')
+        self.stdout.write(self.style.SUCCESS(
+            '✅ No collisions, every worker saw increasing numbers'
+        ))
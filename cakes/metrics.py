@@ -0,0 +1,149 @@
+"""
+Per-view request metrics.
+
+``RequestStats`` collects SQL query count/time and template render time for
+the request being handled (through a context variable, so it is safe under
+threads and ASGI). ``RequestMetricsMiddleware`` in ``cakes.middleware``
+records the finished stats here, tagged by URL name, and the ``metrics``
+view exposes the totals in Prometheus text format.
+
+Totals are kept per process, so every gunicorn worker reports its own.
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template import TemplateDoesNotExist
+
+_current_stats = ContextVar('request_stats', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view exceeds its query budget and raising is enabled"""
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.total_seconds = 0.0
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection (see ``CakesConfig``).
+
+    It looks the stats up through the context variable rather than
+    wrapping a single connection, so queries run by ``sync_to_async``
+    threads under ASGI are counted too.
+    """
+    stats = current_stats()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - start
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``query_wrapper``"""
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def finish_request(token):
+    _current_stats.reset(token)
+
+
+def current_stats():
+    return _current_stats.get()
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = current_stats()
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_seconds += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that adds render time to the request stats"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class MetricsRegistry:
+    """Thread safe per-view totals rendered as Prometheus text"""
+
+    METRICS = [
+        ('requests_total', 'counter', 'Requests handled'),
+        ('request_seconds_total', 'counter', 'Total request latency'),
+        ('sql_queries_total', 'counter', 'SQL queries executed'),
+        ('sql_seconds_total', 'counter', 'Time spent in SQL'),
+        ('template_seconds_total', 'counter', 'Time spent rendering'),
+        ('query_budget_exceeded_total', 'counter',
+         'Requests that went over their query budget'),
+    ]
+
+    def __init__(self, prefix='mammas_cakes'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, stats, over_budget=False):
+        with self._lock:
+            totals = self._views.setdefault(
+                view, dict.fromkeys([name for name, _, _ in self.METRICS], 0)
+            )
+            totals['requests_total'] += 1
+            totals['request_seconds_total'] += stats.total_seconds
+            totals['sql_queries_total'] += stats.queries
+            totals['sql_seconds_total'] += stats.sql_seconds
+            totals['template_seconds_total'] += stats.template_seconds
+            totals['query_budget_exceeded_total'] += int(over_budget)
+
+    def snapshot(self):
+        with self._lock:
+            return {view: dict(totals) for view, totals in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, kind, help_text in self.METRICS:
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for view in sorted(snapshot):
+                value = snapshot[view][name]
+                value = int(value) if float(value).is_integer() else value
+                lines.append(f'{metric}{{view="{view}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
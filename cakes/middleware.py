@@ -0,0 +1,88 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import (
+    QueryBudgetExceeded,
+    finish_request,
+    registry,
+    start_request,
+)
+
+logger = logging.getLogger('cakes.metrics')
+
+
+class RequestMetricsMiddleware:
+    """
+    Record SQL, template and total time for every request.
+
+    Each request is added to the per-view totals served at /metrics, and
+    logged as one JSON line on the ``cakes.metrics`` logger at DEBUG
+    (``METRICS_LOG_LEVEL=DEBUG`` to see them). Views listed in
+    ``VIEW_QUERY_BUDGETS`` log a warning when they run more queries than
+    allowed, or raise ``QueryBudgetExceeded`` when
+    ``QUERY_BUDGET_RAISE`` is True (useful in tests and checks).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token = start_request()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_request(token)
+        stats.total_seconds = time.perf_counter() - start
+        return self.record(request, response, stats)
+
+    async def __acall__(self, request):
+        stats, token = start_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            finish_request(token)
+        stats.total_seconds = time.perf_counter() - start
+        return self.record(request, response, stats)
+
+    def record(self, request, response, stats):
+        """Log and store the stats for a finished request"""
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unresolved'
+        budget = getattr(settings, 'VIEW_QUERY_BUDGETS', {}).get(view)
+        over_budget = budget is not None and stats.queries > budget
+
+        registry.record(view, stats, over_budget)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({
+                'event': 'request',
+                'view': view,
+                'method': request.method,
+                'status': response.status_code,
+                'queries': stats.queries,
+                'sql_ms': round(stats.sql_seconds * 1000, 2),
+                'template_ms': round(stats.template_seconds * 1000, 2),
+                'total_ms': round(stats.total_seconds * 1000, 2),
+            }))
+
+        if over_budget:
+            message = (
+                f"View {view} ran {stats.queries} queries, "
+                f"budget is {budget}"
+            )
+            if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+def create_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE SEQUENCE IF NOT EXISTS cakes_order_number_seq"
+        )
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "DROP SEQUENCE IF EXISTS cakes_order_number_seq"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cakes', '0005_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
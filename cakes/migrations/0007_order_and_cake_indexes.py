@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cakes', '0006_ordersequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cake',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['category', 'name'], name='cake_available_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', '-created_at', '-id'], name='order_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_type', '-created_at'], name='order_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at'], name='order_created_idx'),
+        ),
+    ]
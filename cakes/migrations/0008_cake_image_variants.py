@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cakes', '0007_order_and_cake_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cake',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
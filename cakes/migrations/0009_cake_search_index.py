@@ -0,0 +1,62 @@
+# Search index for cakes.search. Neither part is a model field: on
+# PostgreSQL the generated column means the indexed columns can't change
+# type without dropping search_vector first.
+
+from django.db import migrations
+
+
+POSTGRES_FORWARDS = [
+    """
+    ALTER TABLE cakes_cake ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(ingredients, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(allergens, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX cake_search_vector_idx ON cakes_cake "
+    "USING gin (search_vector)",
+]
+
+SQLITE_FORWARDS = [
+    "CREATE VIRTUAL TABLE cakes_cake_fts USING fts5("
+    "name, description, ingredients, allergens, "
+    "tokenize='porter unicode61')",
+    "INSERT INTO cakes_cake_fts "
+    "(rowid, name, description, ingredients, allergens) "
+    "SELECT id, name, description, ingredients, allergens FROM cakes_cake",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_FORWARDS
+    elif vendor == 'sqlite':
+        statements = SQLITE_FORWARDS
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE cakes_cake DROP COLUMN IF EXISTS search_vector"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS cakes_cake_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cakes', '0008_cake_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.23 on 2026-10-18 09:20
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def backfill_occupancy(apps, schema_editor):
+    """Occupancy for the orders already booked from today on"""
+    Order = apps.get_model('cakes', 'Order')
+    SlotOccupancy = apps.get_model('cakes', 'SlotOccupancy')
+    today = timezone.localdate()
+    active = Order.objects.exclude(status='cancelled')
+    rows = []
+    for order_type, date_field, slot_field in [
+            ('collection', 'collection_date', 'collection_time'),
+            ('delivery', 'delivery_date', 'delivery_time')]:
+        counts = (
+            active.filter(order_type=order_type)
+            .filter(**{f'{date_field}__gte': today})
+            .exclude(**{slot_field: ''})
+            .values_list(date_field, slot_field)
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        rows += [
+            SlotOccupancy(
+                order_type=order_type, date=date, slot=slot, reserved=count)
+            for date, slot, count in counts
+        ]
+    SlotOccupancy.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cakes', '0009_cake_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_type', models.CharField(choices=[('collection', 'Collection'), ('delivery', 'Delivery')], max_length=20)),
+                ('slot', models.CharField(max_length=50)),
+                ('capacity', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'slot capacities',
+            },
+        ),
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_type', models.CharField(choices=[('collection', 'Collection'), ('delivery', 'Delivery')], max_length=20)),
+                ('date', models.DateField()),
+                ('slot', models.CharField(max_length=50)),
+                ('reserved', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'slot occupancy',
+            },
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='collection_time',
+            field=models.CharField(blank=True, choices=[('8am-12pm', '8:00 AM - 12:00 PM'), ('12pm-4pm', '12:00 PM - 4:00 PM'), ('4pm-6pm', '4:00 PM - 6:00 PM')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='delivery_time',
+            field=models.CharField(blank=True, choices=[('9am-1pm', '9:00 AM - 1:00 PM'), ('1pm-5pm', '1:00 PM - 5:00 PM'), ('5pm-9pm', '5:00 PM - 9:00 PM')], max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='slotoccupancy',
+            constraint=models.UniqueConstraint(fields=('order_type', 'date', 'slot'), name='slot_occupancy_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='slotcapacity',
+            constraint=models.UniqueConstraint(fields=('order_type', 'slot'), name='slot_capacity_unique'),
+        ),
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
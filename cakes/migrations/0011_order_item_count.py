@@ -0,0 +1,32 @@
+# Generated by Django 4.2.23 on 2026-10-18 09:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_item_count(apps, schema_editor):
+    Order = apps.get_model('cakes', 'Order')
+    OrderItem = apps.get_model('cakes', 'OrderItem')
+    counts = (
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by().values('order').annotate(count=Count('id'))
+        .values('count')
+    )
+    Order.objects.update(item_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cakes', '0010_slot_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_item_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-18 09:23
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cakes', '0011_order_item_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('order_type', models.CharField(choices=[('collection', 'Collection'), ('delivery', 'Delivery')], max_length=20)),
+                ('category', models.CharField(blank=True, choices=[('birthday', 'Birthday Cakes'), ('wedding', 'Wedding Cakes'), ('vegan', 'Vegan Cakes'), ('treats', 'Treats')], max_length=20)),
+                ('cake_name', models.CharField(max_length=200)),
+                ('orders', models.IntegerField(default=0)),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+            ],
+            options={
+                'verbose_name_plural': 'daily sales',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysales',
+            constraint=models.UniqueConstraint(fields=('date', 'order_type', 'category', 'cake_name'), name='daily_sales_unique'),
+        ),
+    ]
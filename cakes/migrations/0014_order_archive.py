@@ -0,0 +1,68 @@
+# Generated by Django 4.2.23 on 2026-10-18 09:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cakes', '0013_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('customer_email', models.EmailField(max_length=254)),
+                ('order_number', models.CharField(max_length=20, unique=True)),
+                ('order_type', models.CharField(choices=[('collection', 'Collection'), ('delivery', 'Delivery')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('preparing', 'Preparing'), ('ready', 'Ready for Collection/Delivery'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('item_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('special_instructions', models.TextField(blank=True)),
+                ('collection_date', models.DateField(blank=True, null=True)),
+                ('collection_time', models.CharField(blank=True, choices=[('8am-12pm', '8:00 AM - 12:00 PM'), ('12pm-4pm', '12:00 PM - 4:00 PM'), ('4pm-6pm', '4:00 PM - 6:00 PM')], max_length=50)),
+                ('delivery_address', models.CharField(blank=True, max_length=200)),
+                ('delivery_city', models.CharField(blank=True, max_length=100)),
+                ('delivery_postcode', models.CharField(blank=True, max_length=20)),
+                ('delivery_date', models.DateField(blank=True, null=True)),
+                ('delivery_time', models.CharField(blank=True, choices=[('9am-1pm', '9:00 AM - 1:00 PM'), ('1pm-5pm', '1:00 PM - 5:00 PM'), ('5pm-9pm', '5:00 PM - 9:00 PM')], max_length=50)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('customer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('cake_name', models.CharField(max_length=200)),
+                ('cake_price', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('cake', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='cakes.cake')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='cakes.archivedorder')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['customer', '-created_at', '-id'], name='archived_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['-created_at'], name='archived_created_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from decimal import Decimal
 
 
@@ -17,6 +18,8 @@ class Cake(models.Model):
     price = models.DecimalField(max_digits=8, decimal_places=2)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     image = models.ImageField(upload_to='cakes/', blank=True, null=True)
+    # Resized copies of image, see cakes.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     ingredients = models.TextField(blank=True)
     allergens = models.CharField(max_length=200, blank=True)
     is_available = models.BooleanField(default=True)
@@ -27,6 +30,13 @@ class Cake(models.Model):
 
     class Meta:
         ordering = ['category', 'name']
+        indexes = [
+            # Listing pages only ever show available cakes
+            models.Index(
+                fields=['category', 'name'],
+                condition=models.Q(is_available=True),
+                name='cake_available_listing_idx'),
+        ]
 
 
 class Customer(models.Model):
@@ -42,7 +52,11 @@ class Customer(models.Model):
         return f"{self.user.username} - {self.user.email}"
 
 
-class Order(models.Model):
+class OrderBase(models.Model):
+    """
+    Fields of an order, shared by live orders and the archive (see
+    cakes.archive)
+    """
     ORDER_STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
@@ -57,6 +71,19 @@ class Order(models.Model):
         ('delivery', 'Delivery'),
     ]
 
+    # Time slots offered at checkout, see cakes.slots for their capacity
+    COLLECTION_SLOT_CHOICES = [
+        ('8am-12pm', '8:00 AM - 12:00 PM'),
+        ('12pm-4pm', '12:00 PM - 4:00 PM'),
+        ('4pm-6pm', '4:00 PM - 6:00 PM'),
+    ]
+
+    DELIVERY_SLOT_CHOICES = [
+        ('9am-1pm', '9:00 AM - 1:00 PM'),
+        ('1pm-5pm', '1:00 PM - 5:00 PM'),
+        ('5pm-9pm', '5:00 PM - 9:00 PM'),
+    ]
+
     # Basic fields
     customer = models.ForeignKey(
         User,
@@ -71,23 +98,33 @@ class Order(models.Model):
         choices=ORDER_STATUS_CHOICES,
         default='pending')
     total = models.DecimalField(max_digits=10, decimal_places=2)
+    # Number of OrderItems, kept up to date by create_order and the
+    # OrderItem signals so listings don't count them
+    item_count = models.PositiveIntegerField(default=0, editable=False)
     special_instructions = models.TextField(blank=True)
 
     # Collection fields
     collection_date = models.DateField(null=True, blank=True)
-    collection_time = models.CharField(max_length=50, blank=True)
+    collection_time = models.CharField(
+        max_length=50,
+        choices=COLLECTION_SLOT_CHOICES,
+        blank=True)
 
     # Delivery fields
     delivery_address = models.CharField(max_length=200, blank=True)
     delivery_city = models.CharField(max_length=100, blank=True)
     delivery_postcode = models.CharField(max_length=20, blank=True)
     delivery_date = models.DateField(null=True, blank=True)
-    delivery_time = models.CharField(max_length=50, blank=True)
+    delivery_time = models.CharField(
+        max_length=50,
+        choices=DELIVERY_SLOT_CHOICES,
+        blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        abstract = True
         ordering = ['-created_at']
 
     def __str__(self):
@@ -109,7 +146,36 @@ class Order(models.Model):
         return status_badges.get(self.status, 'badge-secondary')
 
 
-class OrderItem(models.Model):
+class Order(OrderBase):
+    class Meta(OrderBase.Meta):
+        indexes = [
+            models.Index(
+                fields=['customer', '-created_at', '-id'],
+                name='order_customer_created_idx'),
+            models.Index(
+                fields=['status', '-created_at'],
+                name='order_status_created_idx'),
+            models.Index(
+                fields=['order_type', '-created_at'],
+                name='order_type_created_idx'),
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+        ]
+
+
+class OrderItemBase(models.Model):
+    cake_name = models.CharField(max_length=200)
+    cake_price = models.DecimalField(max_digits=8, decimal_places=2)
+    quantity = models.PositiveIntegerField(default=1)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.cake_name} x {self.quantity}"
+
+
+class OrderItem(OrderItemBase):
     order = models.ForeignKey(
         Order,
         related_name='items',
@@ -119,10 +185,187 @@ class OrderItem(models.Model):
         on_delete=models.CASCADE,
         null=True,
         blank=True)
+
+
+class OutboundEmail(models.Model):
+    """Queued email waiting to be sent by the send_queued_emails worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Failed Permanently'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.TextField(
+        help_text='Comma separated list of recipient addresses')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipients} ({self.status})"
+
+    def recipient_list(self):
+        return [r.strip() for r in self.recipients.split(',') if r.strip()]
+
+
+class OrderSequence(models.Model):
+    """
+    Counter used for order numbers on databases without native sequences.
+    PostgreSQL uses the cakes_order_number_seq sequence instead.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.last_value}"
+
+
+class CatalogueVersion(models.Model):
+    """
+    Single row counting catalogue changes, bumped by the Cake signals.
+    The listing ETags and Last-Modified headers are built from it.
+    """
+    counter = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Catalogue version {self.counter}"
+
+
+class SlotCapacity(models.Model):
+    """How many orders the kitchen takes in one slot on one day"""
+    order_type = models.CharField(
+        max_length=20, choices=Order.ORDER_TYPE_CHOICES)
+    slot = models.CharField(max_length=50)
+    capacity = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name_plural = 'slot capacities'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order_type', 'slot'],
+                name='slot_capacity_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_type} {self.slot}: {self.capacity}"
+
+
+class SlotOccupancy(models.Model):
+    """Active orders booked into a slot on a date, kept by cakes.slots"""
+    order_type = models.CharField(
+        max_length=20, choices=Order.ORDER_TYPE_CHOICES)
+    date = models.DateField()
+    slot = models.CharField(max_length=50)
+    reserved = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'slot occupancy'
+        constraints = [
+            # Also the index availability lookups use (type + date range)
+            models.UniqueConstraint(
+                fields=['order_type', 'date', 'slot'],
+                name='slot_occupancy_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_type} {self.date} {self.slot}: {self.reserved}"
+
+
+class DailySales(models.Model):
+    """
+    Sales of one cake per day and order type, cancelled orders excluded.
+    Maintained by cakes.rollups as orders are placed and change status.
+    """
+    date = models.DateField()
+    order_type = models.CharField(
+        max_length=20, choices=Order.ORDER_TYPE_CHOICES)
+    # Blank when the cake has since been deleted
+    category = models.CharField(
+        max_length=20, choices=Cake.CATEGORY_CHOICES, blank=True)
     cake_name = models.CharField(max_length=200)
-    cake_price = models.DecimalField(max_digits=8, decimal_places=2)
-    quantity = models.PositiveIntegerField(default=1)
-    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    orders = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name_plural = 'daily sales'
+        constraints = [
+            # Leading date column also serves the dashboard's range scans
+            models.UniqueConstraint(
+                fields=['date', 'order_type', 'category', 'cake_name'],
+                name='daily_sales_unique'),
+        ]
 
     def __str__(self):
-        return f"{self.cake_name} x {self.quantity}"
+        return f"{self.date} {self.cake_name} ({self.order_type})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response to an order request sent with an Idempotency-Key header, so a
+    retry gets the same response instead of placing the order again.
+    Expired rows are deleted by purge_idempotency_keys.
+    """
+    # sha256 of the endpoint, user and client key, see cakes.idempotency
+    key = models.CharField(max_length=64, primary_key=True)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.status_code})"
+
+
+class ArchivedOrder(OrderBase):
+    """
+    Completed or cancelled order moved out of Order by archive_orders.
+    Keeps its Order id, so keyset cursors work across both tables.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta(OrderBase.Meta):
+        indexes = [
+            models.Index(
+                fields=['customer', '-created_at', '-id'],
+                name='archived_customer_created_idx'),
+            models.Index(
+                fields=['-created_at'], name='archived_created_idx'),
+        ]
+
+
+class ArchivedOrderItem(OrderItemBase):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        related_name='items',
+        on_delete=models.CASCADE)
+    # The archive is a record of what was sold, so it outlives the cake
+    cake = models.ForeignKey(
+        Cake,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True)
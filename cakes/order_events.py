@@ -0,0 +1,184 @@
+"""
+Live order status updates for the order pages, as Server-Sent Events.
+
+``publish`` is called when an order's status changes (see
+``cakes.signals``) and the event reaches every ``/orders/<n>/events``
+stream open for that order:
+
+* On PostgreSQL it is sent with ``pg_notify`` inside the saving
+  transaction, so it goes out only if the change commits, and reaches
+  every web process. Each process that has streams open runs one thread
+  LISTENing on a dedicated connection of its own, outside any pool.
+* Elsewhere (SQLite in development) it is dispatched after commit to the
+  streams in this process only.
+
+Waiting streams are ``asyncio.Queue`` objects on the ASGI event loop, so
+a customer watching an order costs one idle connection and no queries.
+Django 4.2 doesn't notice a client going away mid-stream, so streams end
+after ``ORDER_EVENTS_MAX_SECONDS`` and the browser reconnects.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.http import StreamingHttpResponse
+
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'order_status'
+FINAL_STATUSES = {'completed', 'cancelled'}
+STATUS_LABELS = dict(Order.ORDER_STATUS_CHOICES)
+RECONNECT_SECONDS = 5
+
+
+def status_event(order_number, status, updated_at):
+    return {
+        'order_number': order_number,
+        'status': status,
+        'status_display': STATUS_LABELS.get(status, status),
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
+
+
+def format_event(data, retry=None):
+    """``data`` as one SSE ``status`` message"""
+    prefix = f'retry: {retry}\n' if retry else ''
+    return f'{prefix}event: status\ndata: {json.dumps(data)}\n\n'
+
+
+def event_stream_response(content):
+    response = StreamingHttpResponse(
+        content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class PostgresListener(threading.Thread):
+    """LISTENs for order events and hands them to the broker"""
+
+    def __init__(self, broker):
+        super().__init__(name='order-events', daemon=True)
+        self.broker = broker
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception('Order event listener failed, reconnecting')
+                time.sleep(RECONNECT_SECONDS)
+
+    def listen(self):
+        db = connections['default']
+        # A plain psycopg2 connection, never one borrowed from the pooled
+        # backend, which closing here would take out of the pool for good
+        conn = db.Database.connect(**db.get_connection_params())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self.broker.dispatch(json.loads(notify.payload))
+        finally:
+            conn.close()
+
+
+class Broker:
+    """Fans events out to the streams waiting on each order in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = defaultdict(set)
+        self._listener = None
+
+    def subscribe(self, order_number):
+        """Queue receiving ``order_number``'s events, call from the loop"""
+        queue = asyncio.Queue()
+        with self._lock:
+            self._streams[order_number].add(
+                (asyncio.get_running_loop(), queue))
+            if self._listener is None and connection.vendor == 'postgresql':
+                self._listener = PostgresListener(self)
+                self._listener.start()
+        return queue
+
+    def unsubscribe(self, order_number, queue):
+        with self._lock:
+            streams = self._streams.get(order_number, set())
+            streams.difference_update(
+                [stream for stream in streams if stream[1] is queue])
+            if not streams:
+                self._streams.pop(order_number, None)
+
+    def dispatch(self, event):
+        """Deliver ``event`` from any thread"""
+        with self._lock:
+            streams = list(self._streams.get(event['order_number'], ()))
+        for loop, queue in streams:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+
+broker = Broker()
+
+
+def publish(order):
+    """Tell the order's open streams about its new status once committed"""
+    event = status_event(order.order_number, order.status, order.updated_at)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(event)])
+    else:
+        transaction.on_commit(lambda: broker.dispatch(event))
+
+
+async def status_stream(order_number):
+    """
+    The order's current status, then each change until it completes, is
+    cancelled or the stream reaches ``ORDER_EVENTS_MAX_SECONDS``
+    """
+    # Subscribe before reading the status so no change falls in between
+    queue = broker.subscribe(order_number)
+    try:
+        order = await Order.objects.filter(
+            order_number=order_number,
+        ).values('status', 'updated_at').afirst()
+        if order is None:
+            return
+        status = order['status']
+        yield format_event(
+            status_event(order_number, status, order['updated_at']),
+            retry=settings.ORDER_EVENTS_RETRY_MS)
+
+        deadline = time.monotonic() + settings.ORDER_EVENTS_MAX_SECONDS
+        while status not in FINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(),
+                    min(remaining, settings.ORDER_EVENTS_HEARTBEAT_SECONDS))
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ': keepalive\n\n'
+                continue
+            status = event['status']
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(order_number, queue)
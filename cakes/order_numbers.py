@@ -0,0 +1,45 @@
+"""
+Order number generation.
+
+Numbers look like ``MC26101800000042``: the ``MC`` prefix, the order date
+(YYMMDD) and a zero padded value from a database sequence. The sequence
+is shared by every gunicorn worker and dyno, so numbers never collide and
+always increase, which keeps inserts at the end of the unique index.
+"""
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OrderSequence
+
+SEQUENCE_NAME = 'cakes_order_number_seq'
+SEQUENCE_DIGITS = 8
+
+
+def next_order_sequence():
+    """Return the next value of the order number sequence"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s)", [SEQUENCE_NAME])
+            return cursor.fetchone()[0]
+
+    # The UPDATE takes the write lock, so the value read back in the same
+    # transaction belongs to this caller only. The first callers all find
+    # no row: each inserts it unless another already has, then updates.
+    with transaction.atomic():
+        sequence = OrderSequence.objects.filter(name=SEQUENCE_NAME)
+        if not sequence.update(last_value=F('last_value') + 1):
+            OrderSequence.objects.bulk_create(
+                [OrderSequence(name=SEQUENCE_NAME)], ignore_conflicts=True)
+            sequence.update(last_value=F('last_value') + 1)
+        return sequence.values_list('last_value', flat=True).get()
+
+
+def format_order_number(value, date=None):
+    date = date or timezone.localdate()
+    return f"MC{date:%y%m%d}{value:0{SEQUENCE_DIGITS}d}"
+
+
+def generate_order_number():
+    """Generate a unique, sortable order number"""
+    return format_order_number(next_order_sequence())
@@ -0,0 +1,95 @@
+"""
+Reusable order listing queries.
+
+Listings are ordered by (created_at, id) descending and paged with a
+keyset cursor instead of OFFSET, so every page costs the same however
+many orders a customer has. Item counts are stored on the order.
+
+Old orders live in ArchivedOrder (see ``cakes.archive``) under the same
+ids, so a customer's history is the two tables merged page by page and
+a single order is looked up in the archive when it isn't live.
+"""
+import base64
+import binascii
+import heapq
+
+from django.db.models import Prefetch, Q
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+def customer_orders(user, model=Order):
+    """Orders for a customer, newest first"""
+    return model.objects.filter(customer=user).order_by('-created_at', '-id')
+
+
+def orders_with_items(model=Order, item_model=OrderItem):
+    """Orders with customer and items (and their cakes) loaded up front"""
+    return model.objects.select_related('customer').prefetch_related(
+        Prefetch('items', queryset=item_model.objects.select_related('cake'))
+    )
+
+
+def find_order(**filters):
+    """
+    The order matching ``filters`` with its items, from the live orders
+    or else the archive, or None
+    """
+    order = orders_with_items().filter(**filters).first()
+    if order is None:
+        order = orders_with_items(
+            ArchivedOrder, ArchivedOrderItem).filter(**filters).first()
+    return order
+
+
+def encode_cursor(order):
+    raw = f"{order.created_at.isoformat()}|{order.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(created_at, id)`` or None when the cursor is invalid"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        )
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if created_at is None:
+        return None
+    return created_at, pk
+
+
+def keyset_page(queryset, cursor=None, page_size=20, merge_with=()):
+    """
+    Return ``(orders, next_cursor)`` for the page after ``cursor``.
+
+    ``queryset`` must be ordered by ``-created_at, -id``. ``next_cursor``
+    is None on the last page. The querysets in ``merge_with``, ordered the
+    same way and with ids distinct from it, are merged into the page.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    condition = Q()
+    if position:
+        created_at, pk = position
+        condition = (
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+
+    # One extra row tells us whether there is another page
+    pages = [
+        list(qs.filter(condition)[:page_size + 1])
+        for qs in (queryset, *merge_with)
+    ]
+    orders = list(heapq.merge(
+        *pages, key=lambda order: (order.created_at, order.pk),
+        reverse=True))
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        next_cursor = encode_cursor(orders[-1])
+    return orders, next_cursor
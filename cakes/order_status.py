@@ -0,0 +1,123 @@
+"""
+Order status workflow.
+
+``TRANSITIONS`` is the state machine over ``Order.ORDER_STATUS_CHOICES``:
+the statuses an order can move to from each status. The admin checks it
+when an order is edited, and the bulk admin actions use
+``bulk_transition``, which
+
+* moves every eligible order with one UPDATE, bumping ``updated_at`` so
+  the order pages' ETags change;
+* sends ``post_save`` for each order itself, since update() skips it, so
+  slots are freed, the sales rollup adjusted and open status streams told
+  exactly as for a single save;
+* queues every customer email with one INSERT, which the outbox worker
+  sends in batches over one SMTP connection.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Order
+from .outbox import enqueue_emails
+from .signals import remember_state
+
+TRANSITIONS = {
+    'pending': {'confirmed', 'cancelled'},
+    'confirmed': {'preparing', 'cancelled'},
+    'preparing': {'ready', 'cancelled'},
+    'ready': {'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': set(),
+}
+
+STATUS_LABELS = dict(Order.ORDER_STATUS_CHOICES)
+
+# Statuses an order can be moved to, in the order of the choices
+TARGET_STATUSES = [
+    status for status, _ in Order.ORDER_STATUS_CHOICES
+    if any(status in targets for targets in TRANSITIONS.values())
+]
+
+
+def can_transition(current, status):
+    return status in TRANSITIONS.get(current, ())
+
+
+def status_message(order):
+    if order.status == 'ready':
+        if order.order_type == 'delivery':
+            return "Your order is ready and will be with you soon."
+        return "Your order is ready for collection."
+    return {
+        'confirmed': "We've confirmed your order.",
+        'preparing': "We've started preparing your order.",
+        'completed': "Your order is complete. We hope you enjoy it!",
+        'cancelled': (
+            "Your order has been cancelled. If you weren't expecting "
+            "this, please get in touch."),
+    }.get(order.status, f"Your order is now {order.get_status_display()}.")
+
+
+def status_email(order):
+    if order.customer:
+        customer_name = order.customer.first_name or order.customer.username
+    else:
+        customer_name = order.customer_email or "Customer"
+    message = status_message(order)
+    return {
+        'subject': (
+            f'Order {order.order_number} - {order.get_status_display()}'),
+        'body': (
+            f"Dear {customer_name},\n\n{message}\n\n"
+            f"Order Number: {order.order_number}\n\n"
+            f"Best regards,\nMammas Cakes Team\n"),
+        'html_body': render_to_string('emails/order_status.html', {
+            'order': order,
+            'customer_name': customer_name,
+            'message': message,
+        }),
+        'recipient_list': [order.customer_email],
+    }
+
+
+def queue_status_emails(orders):
+    """Queue a status update email for each order, with one INSERT"""
+    return enqueue_emails(
+        [status_email(order) for order in orders if order.customer_email])
+
+
+def bulk_transition(queryset, status):
+    """
+    Move the orders in ``queryset`` that can go to ``status`` there and
+    email their customers. Returns ``(moved, skipped)`` lists of orders.
+    """
+    pks = list(queryset.values_list('pk', flat=True))
+    with transaction.atomic():
+        # Locked in primary key order so two bulk actions can't deadlock
+        orders = list(
+            Order.objects.select_for_update(of=('self',))
+            .select_related('customer')
+            .prefetch_related('items__cake')
+            .filter(pk__in=pks)
+            .order_by('pk')
+        )
+        moved = [o for o in orders if can_transition(o.status, status)]
+        skipped = [o for o in orders if not can_transition(o.status, status)]
+        if not moved:
+            return moved, skipped
+
+        now = timezone.now()
+        Order.objects.filter(pk__in=[order.pk for order in moved]).update(
+            status=status, updated_at=now)
+        for order in moved:
+            remember_state(order, order)
+            order.status = status
+            order.updated_at = now
+            post_save.send(
+                sender=Order, instance=order, created=False, raw=False,
+                using=order._state.db,
+                update_fields=frozenset(['status', 'updated_at']))
+        queue_status_emails(moved)
+    return moved, skipped
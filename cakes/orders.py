@@ -0,0 +1,176 @@
+"""
+Order creation shared by the place_order and checkout views.
+
+Prices always come from the Cake table, never from the client. All line
+items are resolved with a single ``in_bulk`` lookup and written with one
+``bulk_create`` inside the same transaction as the Order, which also
+reserves the collection/delivery slot (see ``cakes.slots``) and adds the
+order to the daily sales rollup (``cakes.rollups``).
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date
+
+from .models import Cake, Order, OrderItem
+from .rollups import apply_order
+from .slots import SlotUnavailable, reserve_slot, validate_slot
+
+
+class OrderError(ValueError):
+    """Raised when the submitted order data is invalid"""
+
+
+# Order fields that must be strings when they are sent
+TEXT_FIELDS = [
+    'customer_email', 'delivery_option', 'special_instructions',
+    'collection_date', 'collection_time', 'delivery_address',
+    'delivery_city', 'delivery_postcode', 'delivery_date', 'delivery_time',
+]
+
+
+def order_data(data):
+    """
+    Check a decoded request body is an order object and return it. A null
+    text field counts as not sent.
+    """
+    if not isinstance(data, dict):
+        raise OrderError('Order data must be a JSON object')
+    for field in TEXT_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise OrderError(f'Invalid {field}')
+    return {
+        key: value for key, value in data.items()
+        if not (key in TEXT_FIELDS and value is None)
+    }
+
+
+def _parse_int(value, message):
+    """Whole numbers only, JSON true and 1.9 aren't quietly made 1"""
+    if isinstance(value, bool) or (
+            isinstance(value, float) and not value.is_integer()):
+        raise OrderError(message)
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise OrderError(message)
+
+
+def _parse_quantity(value):
+    quantity = _parse_int(value, 'Invalid quantity')
+    if quantity < 1:
+        raise OrderError('Quantity must be at least 1')
+    if quantity > settings.ORDER_MAX_QUANTITY:
+        raise OrderError(
+            f'Quantity can be at most {settings.ORDER_MAX_QUANTITY}')
+    return quantity
+
+
+def resolve_line_items(items):
+    """
+    Turn ``[{'cake_id': .., 'quantity': ..}, ...]`` into
+    ``[(cake, quantity), ...]`` using one query.
+    """
+    if not items:
+        raise OrderError('No items in order')
+    if not isinstance(items, list):
+        raise OrderError('items must be a list')
+
+    requested = []
+    for item in items:
+        try:
+            cake_id = _parse_int(item['cake_id'], 'Invalid cake id')
+        except (KeyError, TypeError):
+            raise OrderError('Invalid cake id')
+        requested.append((cake_id, _parse_quantity(item.get('quantity', 1))))
+
+    cakes = Cake.objects.filter(is_available=True).in_bulk(
+        {cake_id for cake_id, _ in requested}
+    )
+
+    line_items = []
+    for cake_id, quantity in requested:
+        cake = cakes.get(cake_id)
+        if cake is None:
+            raise OrderError(f'Cake {cake_id} is not available')
+        line_items.append((cake, quantity))
+    return line_items
+
+
+def create_order(customer, data, line_items, order_number):
+    """Create an Order and its OrderItems in a single transaction"""
+    items = [
+        OrderItem(
+            cake=cake,
+            cake_name=cake.name,
+            cake_price=cake.price,
+            quantity=quantity,
+            total_price=cake.price * quantity,
+        )
+        for cake, quantity in line_items
+    ]
+    total = sum((item.total_price for item in items), Decimal('0.00'))
+
+    order_types = dict(Order.ORDER_TYPE_CHOICES)
+    if data.get('delivery_option') not in order_types:
+        raise OrderError('Invalid delivery option')
+    try:
+        collection_date = parse_date(data.get('collection_date') or '')
+        delivery_date = parse_date(data.get('delivery_date') or '')
+    except ValueError:
+        raise OrderError('Invalid date')
+
+    order = Order(
+        customer=customer,
+        customer_email=data['customer_email'],
+        order_number=order_number,
+        order_type=data['delivery_option'],
+        total=total,
+        item_count=len(items),
+        special_instructions=data.get('special_instructions') or '',
+
+        # Collection fields
+        collection_date=collection_date,
+        collection_time=data.get('collection_time') or '',
+
+        # Delivery fields
+        delivery_address=data.get('delivery_address') or '',
+        delivery_city=data.get('delivery_city') or '',
+        delivery_postcode=data.get('delivery_postcode') or '',
+        delivery_date=delivery_date,
+        delivery_time=data.get('delivery_time') or '',
+    )
+    if order.order_type == 'collection':
+        date, slot = order.collection_date, order.collection_time
+    else:
+        date, slot = order.delivery_date, order.delivery_time
+
+    with transaction.atomic():
+        try:
+            validate_slot(order.order_type, date, slot)
+            reserve_slot(order.order_type, date, slot)
+        except SlotUnavailable as e:
+            raise OrderError(str(e))
+        # Tells the Order signals the slot is already reserved
+        order._slot_reserved = True
+        order.save(force_insert=True)
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
+        apply_order(order, items=items)
+
+    return order
+
+
+def refresh_item_count(order_id):
+    """Recount an order's items in one UPDATE, after items are edited"""
+    counts = (
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by().values('order').annotate(count=Count('id'))
+        .values('count')
+    )
+    Order.objects.filter(pk=order_id).update(
+        item_count=Coalesce(Subquery(counts), Value(0)))
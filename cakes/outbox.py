@@ -0,0 +1,126 @@
+"""
+Database backed email outbox.
+
+Views call ``enqueue_email`` so a request never waits on SMTP. The
+``send_queued_emails`` management command drains the queue in batches
+over a single SMTP connection, retrying failures with exponential
+backoff and giving up after ``EMAIL_OUTBOX_MAX_ATTEMPTS``.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, recipient_list, from_email=None,
+                  html_body=''):
+    """Store an email in the outbox and return the queued row"""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=','.join(recipient_list),
+    )
+
+
+def enqueue_emails(messages):
+    """
+    Store many emails with one INSERT. ``messages`` are dicts of
+    ``enqueue_email``'s arguments.
+    """
+    return OutboundEmail.objects.bulk_create([
+        OutboundEmail(
+            subject=message['subject'],
+            body=message['body'],
+            html_body=message.get('html_body') or '',
+            from_email=(
+                message.get('from_email') or settings.DEFAULT_FROM_EMAIL),
+            recipients=','.join(message['recipient_list']),
+        )
+        for message in messages
+    ])
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipient_list(),
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_SECONDS', 60)
+    return timedelta(seconds=base * (2 ** (attempts - 1)))
+
+
+def drain_outbox(batch_size=None):
+    """
+    Send one batch of due emails over a single connection.
+
+    Returns a ``(sent, failed)`` tuple. Rows are locked for the duration
+    of the batch so several workers can run side by side.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    sent = failed = 0
+
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if not batch:
+            return sent, failed
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for email in batch:
+                email.attempts += 1
+                try:
+                    _build_message(email, connection).send()
+                except Exception as e:
+                    failed += 1
+                    email.last_error = str(e)
+                    if email.attempts >= max_attempts:
+                        email.status = 'dead'
+                        logger.error(
+                            "Giving up on outbox email %s after %s "
+                            "attempts: %s",
+                            email.pk, email.attempts, e)
+                    else:
+                        email.next_attempt_at = (
+                            timezone.now() + _retry_delay(email.attempts)
+                        )
+                        logger.warning(
+                            "Outbox email %s failed (attempt %s): %s",
+                            email.pk, email.attempts, e)
+                else:
+                    sent += 1
+                    email.status = 'sent'
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+        finally:
+            connection.close()
+
+        OutboundEmail.objects.bulk_update(
+            batch,
+            ['attempts', 'status', 'sent_at', 'last_error', 'next_attempt_at'],
+        )
+
+    return sent, failed
@@ -0,0 +1,180 @@
+"""
+Daily sales rollups behind the staff sales dashboard.
+
+``DailySales`` holds one row per day, order type, category and cake with
+its order count, quantity and revenue. Rows are adjusted as orders change
+rather than recomputed from Order/OrderItem:
+
+* ``create_order`` adds a new order's items in its own transaction.
+* The Order signals in ``cakes.signals`` take an order out when it is
+  cancelled or deleted, and put it back if it is un-cancelled.
+* Editing items in the admin rebuilds that order's day, once per
+  transaction however many items changed.
+
+``rebuild_sales_rollup`` recomputes any date range from scratch, from
+the live orders and the archive (see ``cakes.archive``).
+
+An order is applied with the same two statements however many items it
+has. On PostgreSQL, applying holds a shared advisory lock and rebuilding
+an exclusive one, so a rebuild never misses or overwrites an order
+applied while it was reading. On SQLite the rebuild's first statement is
+a write, which already keeps other writers out until it commits.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import partial, reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import (
+    Case, Count, DecimalField, F, IntegerField, Q, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import ArchivedOrderItem, DailySales, OrderItem
+
+# pg_advisory_xact_lock key shared by apply_order and rebuild_rollup
+ROLLUP_LOCK_ID = 0x5a1e5
+
+
+def _lock_rollup(shared):
+    if connection.vendor != 'postgresql':
+        return
+    function = (
+        'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock')
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {function}(%s)', [ROLLUP_LOCK_ID])
+
+
+def _midnight(date):
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def _per_row(values, output_field):
+    """CASE giving each (category, cake_name) row its own value"""
+    return Case(
+        *[When(category=category, cake_name=cake_name, then=Value(value))
+          for (category, cake_name), value in values.items()],
+        default=Value(0), output_field=output_field)
+
+
+def apply_order(order, sign=1, items=None, order_type=None):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) an order's items. ``items``,
+    or items prefetched with their cakes, save a query.
+    """
+    if items is None:
+        if 'items' in getattr(order, '_prefetched_objects_cache', {}):
+            items = order.items.all()
+        else:
+            items = order.items.select_related('cake')
+    date = timezone.localdate(order.created_at)
+    order_type = order_type or order.order_type
+
+    totals = {}
+    for item in items:
+        key = (item.cake.category if item.cake else '', item.cake_name)
+        quantity, revenue = totals.get(key, (0, Decimal('0.00')))
+        totals[key] = (quantity + item.quantity, revenue + item.total_price)
+
+    if not totals:
+        return
+
+    with transaction.atomic(savepoint=False):
+        _lock_rollup(shared=True)
+        DailySales.objects.bulk_create(
+            [DailySales(date=date, order_type=order_type,
+                        category=category, cake_name=cake_name)
+             for category, cake_name in totals],
+            ignore_conflicts=True)
+        DailySales.objects.filter(
+            reduce(or_, [Q(category=category, cake_name=cake_name)
+                         for category, cake_name in totals]),
+            date=date, order_type=order_type,
+        ).update(
+            orders=F('orders') + sign,
+            quantity=F('quantity') + _per_row(
+                {key: sign * quantity
+                 for key, (quantity, _) in totals.items()},
+                IntegerField()),
+            revenue=F('revenue') + _per_row(
+                {key: sign * revenue
+                 for key, (_, revenue) in totals.items()},
+                DecimalField(max_digits=12, decimal_places=2)),
+        )
+
+
+def _item_totals(item_model, start=None, end=None):
+    items = item_model.objects.exclude(order__status='cancelled')
+    if start:
+        items = items.filter(order__created_at__gte=_midnight(start))
+    if end:
+        items = items.filter(
+            order__created_at__lt=_midnight(end + timedelta(days=1)))
+    return (
+        items.values(
+            'cake_name',
+            day=TruncDate('order__created_at'),
+            type=F('order__order_type'),
+            cake_category=Coalesce('cake__category', Value('')),
+        )
+        .annotate(
+            order_count=Count('order', distinct=True),
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum('total_price'),
+        )
+        .order_by()
+    )
+
+
+def rebuild_rollup(start=None, end=None):
+    """
+    Recompute DailySales for ``start`` to ``end`` (inclusive, either can
+    be None for no limit) from the orders. Returns the rows written.
+    """
+    rollups = DailySales.objects.all()
+    if start:
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        rollups = rollups.filter(date__lte=end)
+
+    with transaction.atomic():
+        _lock_rollup(shared=False)
+        rollups.delete()
+        # An order is either live or archived, so their counts simply add
+        # up
+        rows = {}
+        for item_model in (OrderItem, ArchivedOrderItem):
+            for row in _item_totals(item_model, start, end).iterator():
+                key = (
+                    row['day'], row['type'], row['cake_category'],
+                    row['cake_name'])
+                if key not in rows:
+                    rows[key] = DailySales(
+                        date=row['day'],
+                        order_type=row['type'],
+                        category=row['cake_category'],
+                        cake_name=row['cake_name'],
+                    )
+                rows[key].orders += row['order_count']
+                rows[key].quantity += row['total_quantity']
+                rows[key].revenue += row['total_revenue']
+        DailySales.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def rebuild_order_day(order):
+    """
+    Recompute the day of an order once the current transaction commits.
+    Every item of an edited or deleted order calls this, the day is only
+    queued once.
+    """
+    date = timezone.localdate(order.created_at)
+    pending = transaction.get_connection().run_on_commit
+    if any(getattr(entry[1], 'rollup_day', None) == date
+           for entry in pending):
+        return
+    rebuild = partial(rebuild_rollup, date, date)
+    rebuild.rollup_day = date
+    transaction.on_commit(rebuild)
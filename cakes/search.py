@@ -0,0 +1,191 @@
+"""
+Full-text search over the catalogue.
+
+The search text of a cake is its name, description, ingredients and
+allergens, indexed ahead of time so a search never scans the table:
+
+* PostgreSQL: ``cakes_cake.search_vector``, a generated tsvector column
+  with a GIN index (migration 0009). Postgres keeps it up to date.
+* SQLite: the FTS5 table ``cakes_cake_fts``, kept in step by the Cake
+  signals in ``cakes.signals`` (``rebuild_search_index`` refills it).
+* Anything else falls back to ``icontains``.
+
+Phrases like "no nuts", "without eggs" or "dairy-free" in the search text
+become allergen exclusions instead of search terms.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVectorField,
+)
+from django.db import connection, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .catalogue import available_cakes_queryset
+
+FTS_TABLE = 'cakes_cake_fts'
+SEARCH_CONFIG = 'english'
+
+# Allergens that can be excluded, with the words that mark a cake as
+# containing them in Cake.allergens ("nut" also covers hazelnut, peanut...)
+ALLERGENS = {
+    'nuts': ['nut'],
+    'peanuts': ['peanut'],
+    'gluten': ['gluten', 'wheat'],
+    'dairy': ['milk', 'dairy', 'butter', 'cream'],
+    'eggs': ['egg'],
+    'soya': ['soy'],
+    'sesame': ['sesame'],
+}
+ALLERGEN_ALIASES = {
+    'nut': 'nuts',
+    'peanut': 'peanuts',
+    'wheat': 'gluten',
+    'milk': 'dairy',
+    'lactose': 'dairy',
+    'egg': 'eggs',
+    'soy': 'soya',
+}
+
+EXCLUSION_RE = re.compile(
+    r'\b(?:no|without|free\s+from)\s+(\w+)|\b(\w+)[\s-]free\b',
+    re.IGNORECASE,
+)
+
+
+def allergen_key(word):
+    word = word.lower()
+    if word in ALLERGENS:
+        return word
+    return ALLERGEN_ALIASES.get(word)
+
+
+def parse_query(text):
+    """
+    Split a search into its search text and the allergens to exclude,
+    'chocolate cake no nuts' gives ('chocolate cake', {'nuts'}).
+    """
+    excluded = set()
+
+    def take_exclusion(match):
+        key = allergen_key(match.group(1) or match.group(2))
+        if key is None:
+            return match.group(0)
+        excluded.add(key)
+        return ' '
+
+    text = EXCLUSION_RE.sub(take_exclusion, text)
+    return ' '.join(text.split()), excluded
+
+
+def exclude_allergens(queryset, allergens):
+    words = [word for key in allergens for word in ALLERGENS[key]]
+    if not words:
+        return queryset
+    return queryset.exclude(
+        reduce(or_, (Q(allergens__icontains=word) for word in words))
+    )
+
+
+def fts_query(text):
+    """FTS5 MATCH expression, every word quoted (so user input can't use
+    FTS5 syntax) and prefix matched so partly typed words still hit"""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_cakes(queryset, text):
+    """Filter a Cake queryset to matches for ``text``, best first"""
+    if not text:
+        return queryset
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'postgresql':
+        vector = RawSQL(
+            '"cakes_cake"."search_vector"', [],
+            output_field=SearchVectorField(),
+        )
+        query = SearchQuery(
+            text, config=SEARCH_CONFIG, search_type='websearch')
+        return (
+            queryset.alias(search=vector)
+            .filter(search=query)
+            .annotate(rank=SearchRank(vector, query))
+            .order_by('-rank', 'name')
+        )
+
+    if vendor == 'sqlite':
+        match = fts_query(text)
+        if not match:
+            return queryset.none()
+        # Name matches count most, then description, then the rest
+        return (
+            queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [match],
+            ))
+            .annotate(rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, 10.0, 4.0, 2.0, 1.0) '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'AND rowid = "cakes_cake"."id"',
+                [match], output_field=FloatField(),
+            ))
+            .order_by('-rank', 'name')
+        )
+
+    for word in text.split():
+        queryset = queryset.filter(
+            Q(name__icontains=word) | Q(description__icontains=word)
+            | Q(ingredients__icontains=word) | Q(allergens__icontains=word)
+        )
+    return queryset.order_by('name')
+
+
+def search_catalogue(text, excluded=()):
+    """Available cakes matching ``text`` without any ``excluded`` allergen"""
+    queryset = available_cakes_queryset()
+    if text:
+        queryset = search_cakes(queryset, text)
+    else:
+        queryset = queryset.order_by('name')
+    return exclude_allergens(queryset, excluded)
+
+
+def update_index(cake):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [cake.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} '
+            f'(rowid, name, description, ingredients, allergens) '
+            f'VALUES (%s, %s, %s, %s, %s)',
+            [cake.pk, cake.name, cake.description, cake.ingredients,
+             cake.allergens],
+        )
+
+
+def remove_from_index(cake_id):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [cake_id])
+
+
+def rebuild_index():
+    """Refill the SQLite index from cakes_cake, returns the row count"""
+    if connection.vendor != 'sqlite':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} '
+            f'(rowid, name, description, ingredients, allergens) '
+            f'SELECT id, name, description, ingredients, allergens '
+            f'FROM cakes_cake'
+        )
+        return cursor.rowcount
@@ -0,0 +1,149 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .auth_backends import invalidate_user
+from .catalogue import invalidate_categories, record_catalogue_change
+from .models import Cake, Customer, Order, OrderItem
+from .order_events import publish
+from .orders import refresh_item_count
+from .rollups import apply_order, rebuild_order_day
+from .search import remove_from_index, update_index
+from .slots import order_slot, release_slot, reserve_slot
+
+
+@receiver(pre_save, sender=Cake)
+def remember_previous_category(sender, instance, **kwargs):
+    """Keep the stored category so a moved cake clears both listings"""
+    instance._previous_category = None
+    if instance.pk:
+        instance._previous_category = (
+            Cake.objects.filter(pk=instance.pk)
+            .values_list('category', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Cake)
+@receiver(post_delete, sender=Cake)
+def invalidate_catalogue_cache(sender, instance, **kwargs):
+    record_catalogue_change()
+    categories = {
+        instance.category,
+        getattr(instance, '_previous_category', None),
+    }
+    transaction.on_commit(lambda: invalidate_categories(*categories))
+
+
+@receiver(post_save, sender=Cake)
+def index_cake(sender, instance, **kwargs):
+    update_index(instance)
+
+
+@receiver(post_delete, sender=Cake)
+def unindex_cake(sender, instance, **kwargs):
+    remove_from_index(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_cached_customer_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_user(instance.user_id))
+
+
+def counted_order_type(order):
+    """Order type an order's sales are counted under, None if cancelled"""
+    return None if order.status == 'cancelled' else order.order_type
+
+
+def remember_state(instance, previous):
+    """
+    Record ``previous``, the stored version of ``instance`` (or None), for
+    the post_save receivers below. cakes.order_status calls it directly
+    for orders it changes with update().
+    """
+    instance._previous_slot = None
+    instance._previous_counted_type = None
+    instance._previous_status = None
+    if previous is not None:
+        instance._previous_slot = order_slot(previous)
+        instance._previous_counted_type = counted_order_type(previous)
+        instance._previous_status = previous.status
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored slot, sales and status state so a moved or cancelled
+    order frees its slot, leaves the sales rollup and tells its watchers
+    """
+    previous = None
+    if instance.pk and not raw:
+        previous = Order.objects.filter(pk=instance.pk).only(
+            'status', 'order_type', 'collection_date', 'collection_time',
+            'delivery_date', 'delivery_time',
+        ).first()
+    remember_state(instance, previous)
+
+
+@receiver(post_save, sender=Order)
+def update_slot_occupancy(sender, instance, created, raw=False, **kwargs):
+    # loaddata skips this, run rebuild_slot_occupancy afterwards
+    if raw or (created and getattr(instance, '_slot_reserved', False)):
+        return
+    previous = getattr(instance, '_previous_slot', None)
+    current = order_slot(instance)
+    if previous == current:
+        return
+    if previous:
+        release_slot(*previous)
+    if current:
+        # Staff can move an order into a full slot
+        reserve_slot(*current, check_capacity=False)
+
+
+@receiver(post_save, sender=Order)
+def update_sales_rollup(sender, instance, created, raw=False, **kwargs):
+    # New orders have no items yet, create_order and the OrderItem
+    # signals below add them
+    if raw or created:
+        return
+    previous = instance._previous_counted_type
+    current = counted_order_type(instance)
+    if previous == current:
+        return
+    if previous:
+        apply_order(instance, -1, order_type=previous)
+    if current:
+        apply_order(instance, 1)
+
+
+@receiver(post_save, sender=Order)
+def publish_status_change(sender, instance, created, raw=False, **kwargs):
+    if raw or created or instance._previous_status == instance.status:
+        return
+    publish(instance)
+
+
+@receiver(post_delete, sender=Order)
+def release_deleted_order_slot(sender, instance, **kwargs):
+    slot = order_slot(instance)
+    if slot:
+        release_slot(*slot)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def update_item_count(sender, instance, raw=False, **kwargs):
+    # create_order sets item_count and the rollup itself, its bulk_create
+    # sends no signals. This also runs for each item of a deleted order.
+    if not raw:
+        refresh_item_count(instance.order_id)
+        rebuild_order_day(instance.order)
@@ -0,0 +1,171 @@
+"""
+Collection and delivery slot capacity.
+
+``SlotOccupancy`` holds the number of active orders in every slot on every
+day. It is changed one order at a time: ``reserve_slot`` when an order is
+placed (with one conditional UPDATE, so concurrent checkouts can't
+overbook) and the Order signals in ``cakes.signals`` when an order is
+cancelled, moved or deleted. Availability is read from it directly
+instead of counting orders. ``rebuild_slot_occupancy`` recomputes it from
+the orders.
+
+Capacities come from ``SlotCapacity`` rows (editable in the admin), or
+``SLOT_DEFAULT_CAPACITY`` for slots without one.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Order, SlotCapacity, SlotOccupancy
+
+SLOT_CHOICES = {
+    'collection': Order.COLLECTION_SLOT_CHOICES,
+    'delivery': Order.DELIVERY_SLOT_CHOICES,
+}
+
+
+class SlotUnavailable(Exception):
+    """Raised when an order's slot can't be booked"""
+
+
+def order_slot(order):
+    """(order_type, date, slot) held by an order, None if it holds none"""
+    if order.status == 'cancelled':
+        return None
+    if order.order_type == 'collection':
+        date, slot = order.collection_date, order.collection_time
+    else:
+        date, slot = order.delivery_date, order.delivery_time
+    if date is None or not slot:
+        return None
+    return order.order_type, date, slot
+
+
+def earliest_date():
+    return timezone.localdate() + timedelta(days=settings.SLOT_MIN_LEAD_DAYS)
+
+
+def validate_slot(order_type, date, slot):
+    if slot not in dict(SLOT_CHOICES[order_type]):
+        raise SlotUnavailable('Please choose a valid time slot')
+    if date is None:
+        raise SlotUnavailable(f'Please choose a {order_type} date')
+    if date < earliest_date():
+        raise SlotUnavailable(
+            f'The earliest {order_type} date is {earliest_date():%d/%m/%Y}')
+
+
+def capacities(order_type):
+    """{slot: capacity} for every slot of an order type"""
+    configured = dict(
+        SlotCapacity.objects.filter(order_type=order_type)
+        .values_list('slot', 'capacity')
+    )
+    return {
+        slot: configured.get(slot, settings.SLOT_DEFAULT_CAPACITY)
+        for slot, _ in SLOT_CHOICES[order_type]
+    }
+
+
+def slot_capacity(order_type, slot):
+    """A slot's capacity as an expression, for use inside one statement"""
+    configured = SlotCapacity.objects.filter(
+        order_type=order_type, slot=slot).values('capacity')[:1]
+    return Coalesce(
+        Subquery(configured), Value(settings.SLOT_DEFAULT_CAPACITY),
+        output_field=IntegerField())
+
+
+def reserve_slot(order_type, date, slot, check_capacity=True):
+    """
+    Take one place in a slot. Call it inside the transaction that creates
+    the order, so the place is given back if the order fails.
+
+    Only writes, no locking read: the row is inserted if missing and the
+    place taken by an UPDATE that checks the capacity itself. That is
+    atomic on PostgreSQL, and on SQLite a read before the write would make
+    concurrent checkouts fail with "database is locked".
+    """
+    SlotOccupancy.objects.bulk_create(
+        [SlotOccupancy(order_type=order_type, date=date, slot=slot)],
+        ignore_conflicts=True)
+    places = SlotOccupancy.objects.filter(
+        order_type=order_type, date=date, slot=slot)
+    if check_capacity:
+        places = places.filter(
+            reserved__lt=slot_capacity(order_type, slot))
+    if not places.update(reserved=F('reserved') + 1):
+        raise SlotUnavailable(
+            'That time slot is fully booked, please choose another')
+
+
+def release_slot(order_type, date, slot):
+    SlotOccupancy.objects.filter(
+        order_type=order_type, date=date, slot=slot, reserved__gt=0
+    ).update(reserved=F('reserved') - 1)
+
+
+def availability(order_type, start, days):
+    """
+    Every slot of ``order_type`` from ``start`` for ``days`` days with its
+    capacity and remaining places. Two queries whatever the range.
+    """
+    end = start + timedelta(days=days - 1)
+    slot_capacities = capacities(order_type)
+    reserved = {
+        (date, slot): count
+        for date, slot, count in SlotOccupancy.objects.filter(
+            order_type=order_type, date__range=(start, end)
+        ).values_list('date', 'slot', 'reserved')
+    }
+    earliest = earliest_date()
+
+    slots = []
+    for offset in range(days):
+        date = start + timedelta(days=offset)
+        for slot, label in SLOT_CHOICES[order_type]:
+            capacity = slot_capacities[slot]
+            remaining = max(0, capacity - reserved.get((date, slot), 0))
+            if date < earliest:
+                remaining = 0
+            slots.append({
+                'date': date.isoformat(),
+                'slot': slot,
+                'label': label,
+                'capacity': capacity,
+                'remaining': remaining,
+                'available': remaining > 0,
+            })
+    return slots
+
+
+def rebuild_occupancy(since=None):
+    """Recompute occupancy from the orders, returns the rows written"""
+    since = since or timezone.localdate()
+    active = Order.objects.exclude(status='cancelled')
+    rows = []
+    for order_type, date_field, slot_field in [
+            ('collection', 'collection_date', 'collection_time'),
+            ('delivery', 'delivery_date', 'delivery_time')]:
+        counts = (
+            active.filter(order_type=order_type)
+            .filter(**{f'{date_field}__gte': since})
+            .exclude(**{slot_field: ''})
+            .values_list(date_field, slot_field)
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        rows += [
+            SlotOccupancy(
+                order_type=order_type, date=date, slot=slot, reserved=count)
+            for date, slot, count in counts
+        ]
+
+    with transaction.atomic():
+        SlotOccupancy.objects.filter(date__gte=since).delete()
+        SlotOccupancy.objects.bulk_create(rows)
+    return len(rows)
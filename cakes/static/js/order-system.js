@@ -6,6 +6,7 @@ console.log('Order System JavaScript Loading...');
 class OrderSystem {
     constructor() {
         this.currentCake = null;
+        this.pendingOrder = null;
         this.init();
     }
 
@@ -34,6 +35,12 @@ class OrderSystem {
             if (e.target.name === 'delivery_option') {
                 this.toggleDeliveryOption();
             }
+            if (e.target.id === 'collection-date') {
+                this.updateSlotAvailability('collection', e.target.value);
+            }
+            if (e.target.id === 'delivery-date') {
+                this.updateSlotAvailability('delivery', e.target.value);
+            }
         });
     }
 
@@ -50,6 +57,33 @@ class OrderSystem {
         if (deliveryDate) deliveryDate.min = minDate;
     }
 
+    async updateSlotAvailability(type, date) {
+        // Disable the time slots that are fully booked on the chosen date
+        const select = document.getElementById(`${type}-time`);
+        if (!select || !date) return;
+
+        try {
+            const response = await fetch(`/slots/?type=${type}&start=${date}&days=1`);
+            if (!response.ok) return;
+            const result = await response.json();
+            const slots = {};
+            result.slots.forEach((slot) => { slots[slot.slot] = slot; });
+
+            Array.from(select.options).forEach((option) => {
+                const slot = slots[option.value];
+                if (!slot) return;
+                option.disabled = !slot.available;
+                option.textContent = slot.available ? slot.label : `${slot.label} (fully booked)`;
+            });
+            if (select.selectedOptions.length && select.selectedOptions[0].disabled) {
+                select.value = '';
+            }
+        } catch (error) {
+            // The server still checks the slot when the order is placed
+            console.error('Slot availability error:', error);
+        }
+    }
+
     handleOrderClick(button) {
         console.log('Order button clicked!', button);
         
@@ -259,14 +293,20 @@ class OrderSystem {
             const csrfToken = this.getCSRFToken();
             console.log('Using CSRF token:', csrfToken);
             
+            // Resending the same order reuses its key, so a retry after a
+            // dropped connection can't place it twice
+            const body = JSON.stringify(formData);
+            const idempotencyKey = this.idempotencyKeyFor(body);
+
             const response = await fetch('/place-order/', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': csrfToken,
-                    'X-Requested-With': 'XMLHttpRequest'
+                    'X-Requested-With': 'XMLHttpRequest',
+                    'Idempotency-Key': idempotencyKey
                 },
-                body: JSON.stringify(formData)
+                body: body
             });
             
             console.log('Response status:', response.status);
@@ -283,6 +323,11 @@ class OrderSystem {
             const result = await response.json();
             console.log('Response data:', result);
 
+            if (response.status < 500) {
+                // Answered, a new submission is a new order
+                this.pendingOrder = null;
+            }
+
             if (response.ok && result.success) {
                 // Close modal
                 const modal = bootstrap.Modal.getInstance(document.getElementById('orderDetailsModal'));
@@ -301,6 +346,16 @@ class OrderSystem {
         }
     }
 
+    idempotencyKeyFor(body) {
+        if (!this.pendingOrder || this.pendingOrder.body !== body) {
+            const key = window.crypto && crypto.randomUUID
+                ? crypto.randomUUID()
+                : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+            this.pendingOrder = { body: body, key: key };
+        }
+        return this.pendingOrder.key;
+    }
+
     getCSRFToken() {
         // Try to get from window variable first
         if (window.csrfToken) {
@@ -333,7 +388,25 @@ class OrderSystem {
     }
 }
 
+// Keep an order's status badge current without reloading the page. The
+// server pushes changes (or, under WSGI, asks to be polled) as
+// Server-Sent Events.
+function watchOrderStatus() {
+    const badge = document.querySelector('[data-order-status]');
+    if (!badge || !window.EventSource) return;
+
+    const source = new EventSource(badge.dataset.orderStatus);
+    source.addEventListener('status', (event) => {
+        const data = JSON.parse(event.data);
+        badge.textContent = data.status_display;
+        if (data.status === 'completed' || data.status === 'cancelled') {
+            source.close();
+        }
+    });
+}
+
 // Initialize when DOM is loaded
 document.addEventListener('DOMContentLoaded', () => {
     const orderSystem = new OrderSystem();
+    watchOrderStatus();
 });
\ No newline at end of file
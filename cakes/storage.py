@@ -0,0 +1,38 @@
+"""
+Static files storage for production.
+
+WhiteNoise's ``CompressedManifestStaticFilesStorage`` gives every file a
+content-hashed name, which WhiteNoise serves with a one year ``immutable``
+cache header, and writes gzip (and Brotli, when the ``Brotli`` package is
+installed) copies next to it at ``collectstatic`` time. Our own
+stylesheets are minified first, so the hashes and compressed copies are
+of the minified files.
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .assets import minify_css
+
+MINIFIED_PREFIXES = ('css/',)
+
+
+class MinifiedManifestStaticFilesStorage(
+        CompressedManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        # The hashed copies are made from the source storage in ``paths``,
+        # so point minified files at the copy in STATIC_ROOT instead
+        if not dry_run:
+            paths = dict(paths)
+            for path in paths:
+                if path.startswith(MINIFIED_PREFIXES) and (
+                        path.endswith('.css')
+                        and not path.endswith('.min.css')):
+                    self.minify(path)
+                    paths[path] = (self, path)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def minify(self, path):
+        with open(self.path(path), encoding='utf-8') as f:
+            css = f.read()
+        with open(self.path(path), 'w', encoding='utf-8') as f:
+            f.write(minify_css(css))
@@ -0,0 +1,96 @@
+from functools import lru_cache
+from pathlib import Path
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from cakes.assets import VENDOR_ASSETS, absolute_urls
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _find(path):
+    return finders.find(path)
+
+
+def _collected(path):
+    """
+    ``path`` as collectstatic wrote it, with its ``url()``s pointing at
+    hashed names, or None before collectstatic
+    """
+    stored_name = getattr(staticfiles_storage, 'stored_name', None)
+    try:
+        name = stored_name(path) if stored_name else path
+        if not staticfiles_storage.exists(name):
+            return None
+        with staticfiles_storage.open(name) as collected:
+            return collected.read().decode('utf-8')
+    except (ValueError, OSError):
+        return None
+
+
+def _link(href, deferred=False, integrity=None):
+    attrs = format_html(
+        ' integrity="{}" crossorigin="anonymous"', integrity
+    ) if integrity else ''
+    if not deferred:
+        return format_html(
+            '<link rel="stylesheet" href="{}"{}>', href, attrs)
+    return format_html(
+        '<link rel="preload" href="{0}" as="style"{1} '
+        'onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{0}"{1}></noscript>',
+        href, attrs)
+
+
+@register.simple_tag
+def stylesheet(path, deferred=False):
+    """
+    ``<link>`` to a static stylesheet. ``deferred`` loads it without
+    blocking rendering, for pages that inline their critical CSS.
+    """
+    return _link(static(path), deferred)
+
+
+@register.simple_tag
+def vendor_stylesheet(name, deferred=False):
+    """
+    ``<link>`` to a self-hosted vendor stylesheet, or to its CDN copy
+    until ``build_assets`` has been run
+    """
+    asset = VENDOR_ASSETS[name]
+    if _find(asset.path):
+        return _link(static(asset.path), deferred)
+    return _link(asset.url, deferred, asset.integrity)
+
+
+@register.simple_tag
+def vendor_script(name):
+    asset = VENDOR_ASSETS[name]
+    if _find(asset.path):
+        return format_html('<script src="{}"></script>', static(asset.path))
+    return format_html(
+        '<script src="{}" integrity="{}" crossorigin="anonymous"></script>',
+        asset.url, asset.integrity)
+
+
+@register.simple_tag
+def critical_css(page):
+    """
+    The page's critical CSS to inline, or '' if it hasn't been built.
+    Relative ``url()``s would resolve against the page, so they are made
+    absolute against the file's own static URL.
+    """
+    path = f'critical/{page}.css'
+    css = _collected(path)
+    if css is None:
+        found = _find(path)
+        if not found:
+            return ''
+        css = Path(found).read_text(encoding='utf-8')
+    return mark_safe(absolute_urls(css, static(path)))
@@ -0,0 +1,47 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.templatetags.static import static
+
+register = template.Library()
+
+CARD_SIZES = '(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw'
+
+
+def _srcset(widths):
+    return ', '.join(
+        f"{default_storage.url(name)} {width}w"
+        for width, name in sorted(widths.items(), key=lambda w: int(w[0]))
+    )
+
+
+@register.inclusion_tag('cakes/includes/cake_picture.html')
+def cake_picture(cake, fallback, css_class='card-img-top', height=220):
+    """
+    Render a cake card image using the precomputed variants, falling back
+    to the original upload and then to a static image.
+    """
+    variants = (cake.image_variants or {}) if cake.image else {}
+    sources = [
+        {'type': f'image/{extension}', 'srcset': _srcset(widths)}
+        for extension, widths in variants.items() if widths
+    ]
+    return {
+        'sources': sources,
+        'src': cake_image_url(cake, fallback),
+        'alt': cake.name,
+        'css_class': css_class,
+        'height': height,
+        'sizes': CARD_SIZES,
+    }
+
+
+@register.simple_tag
+def cake_image_url(cake, fallback, width=640):
+    """URL of the WebP variant closest to ``width``, for modals and data-*"""
+    if not cake.image:
+        return static(fallback)
+    widths = (cake.image_variants or {}).get('webp')
+    if not widths:
+        return cake.image.url
+    best = min(widths, key=lambda w: abs(int(w) - width))
+    return default_storage.url(widths[best])
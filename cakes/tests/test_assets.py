@@ -0,0 +1,154 @@
+from django.test import SimpleTestCase
+
+from cakes.assets import absolute_urls, minify_css, purge_css, rebase_urls
+
+FONT_FACE = (
+    '@font-face{font-family:"Font Awesome 6 Free";'
+    'src:url(../webfonts/fa-solid-900.woff2) format("woff2"),'
+    'url(../webfonts/fa-solid-900.ttf) format("truetype")}'
+)
+
+
+class MinifyCssTests(SimpleTestCase):
+
+    def test_collapses_whitespace(self):
+        self.assertEqual(
+            minify_css('.a , .b {\n  margin : 0 1px ;\n  color: red;\n}\n'),
+            '.a,.b{margin:0 1px;color:red;}')
+
+    def test_drops_comments(self):
+        self.assertEqual(
+            minify_css('/* header */\n.a { color: red; /* why */ }\n/**/'),
+            '.a{color:red;}')
+
+    def test_keeps_comment_markers_inside_strings(self):
+        css = '.a{content:"/* not a comment */"}'
+        self.assertEqual(minify_css(css), css)
+
+    def test_keeps_media_blocks(self):
+        self.assertEqual(
+            minify_css('@media (min-width: 576px) {\n  .a { padding: 0 }\n}'),
+            '@media (min-width: 576px){.a{padding:0}}')
+
+    def test_keeps_font_face(self):
+        self.assertEqual(minify_css(FONT_FACE), FONT_FACE)
+
+    def test_keeps_statements(self):
+        self.assertEqual(
+            minify_css('@charset "UTF-8";\n:root { --x: 1 }'),
+            '@charset "UTF-8";:root{--x:1}')
+
+
+class PurgeCssTests(SimpleTestCase):
+
+    def purge(self, css, used=(), fonts=None):
+        return purge_css(css, set(used), fonts)
+
+    def test_drops_rules_for_unused_classes(self):
+        self.assertEqual(
+            self.purge('.used{color:red}.unused{color:blue}', ['used']),
+            '.used{color:red}')
+
+    def test_keeps_only_the_used_selectors_of_a_rule(self):
+        self.assertEqual(
+            self.purge('.used,.unused>.other{top:0}', ['used']),
+            '.used{top:0}')
+
+    def test_keeps_rules_without_classes(self):
+        css = 'body{margin:0}:root{--x:1}'
+        self.assertEqual(self.purge(css), css)
+
+    def test_ignores_comments(self):
+        self.assertEqual(
+            self.purge('/* .used{} */.used{top:0}/* .unused */', ['used']),
+            '.used{top:0}')
+
+    def test_media_keeps_used_rules(self):
+        self.assertEqual(
+            self.purge(
+                '@media (min-width:576px){.used{top:0}.unused{top:1px}}',
+                ['used']),
+            '@media (min-width:576px){.used{top:0}}')
+
+    def test_media_without_used_rules_is_dropped(self):
+        self.assertEqual(
+            self.purge('@media print{.unused{display:none}}.used{top:0}',
+                       ['used']),
+            '.used{top:0}')
+
+    def test_not_does_not_need_its_class(self):
+        self.assertEqual(
+            self.purge('.btn:not(.unused){top:0}', ['btn']),
+            '.btn:not(.unused){top:0}')
+
+    def test_class_outside_not_is_still_required(self):
+        self.assertEqual(self.purge('.unused:not(.btn){top:0}', ['btn']), '')
+
+    def test_attribute_selectors(self):
+        css = (
+            '[type=checkbox]{top:0}'
+            'a[href$=".pdf"]{top:1px}'
+            '.btn[disabled]{top:2px}'
+            '.unused[disabled]{top:3px}'
+        )
+        self.assertEqual(
+            self.purge(css, ['btn']),
+            '[type=checkbox]{top:0}a[href$=".pdf"]{top:1px}'
+            '.btn[disabled]{top:2px}')
+
+    def test_drops_dark_theme_rules(self):
+        self.assertEqual(
+            self.purge('[data-bs-theme=dark] .used{color:#fff}', ['used']),
+            '')
+
+    def test_font_face_keeps_only_woff2_of_shipped_fonts(self):
+        self.assertEqual(
+            self.purge(FONT_FACE, fonts={'fa-solid-900.woff2'}),
+            '@font-face{font-family:"Font Awesome 6 Free";'
+            'src:url(../webfonts/fa-solid-900.woff2) format("woff2")}')
+
+    def test_font_face_of_other_fonts_is_dropped(self):
+        self.assertEqual(self.purge(FONT_FACE, fonts={'other.woff2'}), '')
+        self.assertEqual(self.purge(FONT_FACE), '')
+
+    def test_drops_unused_keyframes(self):
+        css = (
+            '@keyframes spin{to{transform:rotate(1turn)}}'
+            '@keyframes gone{to{top:0}}'
+            '.used{animation:spin 1s}'
+        )
+        self.assertEqual(
+            self.purge(css, ['used']),
+            '@keyframes spin{to{transform:rotate(1turn)}}'
+            '.used{animation:spin 1s}')
+
+
+class UrlRewritingTests(SimpleTestCase):
+
+    def test_rebase_onto_another_directory(self):
+        self.assertEqual(
+            rebase_urls(
+                '.a{background:url("../images/cake.webp")}'
+                '.b{background:url(icons/x.svg?v=1#top)}',
+                'css/style.css', 'critical/home.css'),
+            '.a{background:url("../images/cake.webp")}'
+            '.b{background:url(../css/icons/x.svg?v=1#top)}')
+
+    def test_rebase_leaves_absolute_and_data_urls(self):
+        css = (
+            '.a{background:url(/static/a.png)}'
+            '.b{background:url(https://example.com/b.png)}'
+            '.c{background:url("data:image/svg+xml,%3csvg%3e")}'
+            '.d{fill:url(#gradient)}'
+        )
+        self.assertEqual(
+            rebase_urls(css, 'css/style.css', 'critical/home.css'), css)
+
+    def test_absolute_urls_for_inlining(self):
+        self.assertEqual(
+            absolute_urls(
+                '.a{background:url(\'../images/cake.1a2b.webp\')}'
+                '.b{background:url(data:image/png;base64,AAAA)}',
+                '/static/critical/home.3c4d.css'),
+            '.a{background:url(\'/static/images/cake.1a2b.webp\')}'
+            '.b{background:url(data:image/png;base64,AAAA)}')
@@ -0,0 +1,16 @@
+from django.test import SimpleTestCase
+
+from cakes.exports import csv_cell
+
+
+class CsvCellTests(SimpleTestCase):
+
+    def test_formulas_are_escaped(self):
+        for value in ('=1+2', '+44 20', '-2', '@SUM(A1)', '\t=1', '\r=1'):
+            with self.subTest(value=value):
+                self.assertEqual(csv_cell(value), "'" + value)
+
+    def test_other_values_are_unchanged(self):
+        for value in ('Happy birthday = 30', '12 High St', '', 3, None):
+            with self.subTest(value=value):
+                self.assertEqual(csv_cell(value), value)
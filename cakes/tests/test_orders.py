@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase, override_settings
+
+from cakes.orders import OrderError, order_data, resolve_line_items
+
+
+class OrderDataTests(SimpleTestCase):
+
+    def test_rejects_bodies_that_are_not_objects(self):
+        for body in ([1, 2], 'x', 3, None):
+            with self.assertRaises(OrderError):
+                order_data(body)
+
+    def test_rejects_text_fields_that_are_not_strings(self):
+        with self.assertRaises(OrderError):
+            order_data({'delivery_address': ['1 High St']})
+
+    def test_null_text_fields_count_as_not_sent(self):
+        data = order_data({
+            'customer_email': 'a@b.com',
+            'special_instructions': None,
+            'delivery_address': None,
+            'items': [],
+        })
+        self.assertEqual(data, {'customer_email': 'a@b.com', 'items': []})
+
+
+@override_settings(ORDER_MAX_QUANTITY=50)
+class ResolveLineItemsTests(SimpleTestCase):
+
+    def assertRejected(self, items, message):
+        with self.assertRaisesMessage(OrderError, message):
+            resolve_line_items(items)
+
+    def test_items_must_be_a_list(self):
+        self.assertRejected({'cake_id': 1}, 'items must be a list')
+
+    def test_cake_id_must_be_a_whole_number(self):
+        for cake_id in (True, 1.9, 'one', None, [1]):
+            with self.subTest(cake_id=cake_id):
+                self.assertRejected([{'cake_id': cake_id}], 'Invalid cake id')
+        self.assertRejected([{'quantity': 1}], 'Invalid cake id')
+
+    def test_quantity_must_be_a_whole_number(self):
+        for quantity in (True, 1.9, float('inf'), 'two', None):
+            with self.subTest(quantity=quantity):
+                self.assertRejected(
+                    [{'cake_id': 1, 'quantity': quantity}],
+                    'Invalid quantity')
+
+    def test_quantity_range(self):
+        self.assertRejected(
+            [{'cake_id': 1, 'quantity': 0}], 'Quantity must be at least 1')
+        self.assertRejected(
+            [{'cake_id': 1, 'quantity': 10000000}],
+            'Quantity can be at most 50')
@@ -0,0 +1,134 @@
+import threading
+import time
+from unittest import mock
+
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from psycopg2.extensions import (
+    STATUS_IN_TRANSACTION,
+    STATUS_READY,
+    TRANSACTION_STATUS_IDLE,
+)
+
+from cakes.db.pooled_postgresql import base
+from cakes.db.pooled_postgresql.base import BlockingConnectionPool, PoolTimeout
+
+ALIAS = 'pool_test'
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for the pool and the backend"""
+
+    def __init__(self, *args, **kwargs):
+        self.closed = 0
+        self.status = STATUS_READY
+        self.info = mock.Mock(transaction_status=TRANSACTION_STATUS_IDLE)
+        self.rollbacks = 0
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = STATUS_READY
+
+    def cursor(self):
+        return mock.MagicMock()
+
+
+class PoolTestCase(SimpleTestCase):
+
+    def setUp(self):
+        connect = mock.patch('psycopg2.pool.psycopg2.connect', FakeConnection)
+        connect.start()
+        self.addCleanup(connect.stop)
+        self.addCleanup(base._pools.clear)
+
+
+class BlockingConnectionPoolTests(PoolTestCase):
+
+    def test_exhausted_pool_times_out(self):
+        pool = BlockingConnectionPool(0, 2, timeout=0.05)
+        pool.getconn()
+        pool.getconn()
+        started = time.monotonic()
+        with self.assertRaisesMessage(PoolTimeout, 'all 2 are in use'):
+            pool.getconn()
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    def test_waits_for_a_connection_to_come_back(self):
+        pool = BlockingConnectionPool(1, 1, timeout=5)
+        connection = pool.getconn()
+        timer = threading.Timer(0.05, pool.putconn, [connection])
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertIs(pool.getconn(), connection)
+
+    def test_failed_connect_frees_its_place(self):
+        pool = BlockingConnectionPool(0, 1, timeout=0.05)
+        with mock.patch(
+                'psycopg2.pool.psycopg2.connect',
+                side_effect=base.psycopg2.OperationalError):
+            with self.assertRaises(base.psycopg2.OperationalError):
+                pool.getconn()
+        pool.getconn()
+
+
+class PooledDatabaseWrapperTests(PoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        jsonb = mock.patch('psycopg2.extras.register_default_jsonb')
+        jsonb.start()
+        self.addCleanup(jsonb.stop)
+        self.handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.dummy'},
+            ALIAS: {
+                'ENGINE': 'cakes.db.pooled_postgresql',
+                'NAME': 'cakes',
+                'POOL_MIN_SIZE': 1,
+                'POOL_MAX_SIZE': 1,
+                'POOL_TIMEOUT': 0.05,
+            },
+        })
+
+    def connect(self):
+        wrapper = self.handler.create_connection(ALIAS)
+        wrapper.connection = wrapper.get_new_connection(
+            wrapper.get_connection_params())
+        return wrapper
+
+    def test_close_returns_the_connection(self):
+        first = self.connect()
+        connection = first.connection
+        first.close()
+        self.assertFalse(connection.closed)
+        # The only connection in the pool is lent out again
+        self.assertIs(self.connect().connection, connection)
+
+    def test_close_rolls_back_an_open_transaction(self):
+        wrapper = self.connect()
+        connection = wrapper.connection
+        connection.status = STATUS_IN_TRANSACTION
+        wrapper.close()
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertIs(self.connect().connection, connection)
+
+    def test_broken_connection_is_discarded(self):
+        wrapper = self.connect()
+        broken = wrapper.connection
+        broken.closed = 2
+        wrapper.close()
+        replacement = self.connect().connection
+        self.assertIsNot(replacement, broken)
+        self.assertFalse(replacement.closed)
+
+    def test_closed_connection_in_pool_is_replaced(self):
+        pool = base.get_pool(ALIAS, {'POOL_MAX_SIZE': 1}, {})
+        pool._pool[0].closed = 2
+        self.assertFalse(self.connect().connection.closed)
+
+    def test_exhausted_pool_raises_after_timeout(self):
+        self.connect()
+        with self.assertRaises(PoolTimeout):
+            self.connect()
@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.test import TestCase, override_settings
+
+from cakes.management.commands.check_query_plans import Command
+
+
+# The views render templates, which need no collected static files
+@override_settings(STATICFILES_STORAGE=(
+    'django.contrib.staticfiles.storage.StaticFilesStorage'))
+class QueryPlanTests(TestCase):
+    """The checks of ``manage.py check_query_plans``, run on the test DB"""
+
+    def setUp(self):
+        self.command = Command(stdout=StringIO())
+        self.command.verbosity = 0
+
+    def test_hot_queries_use_indexes(self):
+        self.assertEqual(self.command.check_plans(), [])
+
+    def test_view_queries_do_not_grow_with_data(self):
+        self.assertEqual(self.command.check_query_counts(), [])
@@ -1,16 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
 
+# Under ASGI the busiest pages are served by their async versions
+if settings.ASYNC_VIEWS:
+    from . import async_views as hot_views
+else:
+    hot_views = views
+
 urlpatterns = [
     # Page URLs
     path('', views.home, name='home'),
-    path('vegan-cakes/', views.vegan_cakes, name='vegan_cakes'),
-    path('birthday-cakes/', views.birthday_cakes, name='birthday_cakes'),
-    path('wedding-cakes/', views.wedding_cakes, name='wedding_cakes'),
-    path('treats/', views.treats, name='treats'),
-    path('products/', views.products, name='products'),
-    path('contact/', views.contact, name='contact'),
+    path('vegan-cakes/', hot_views.vegan_cakes, name='vegan_cakes'),
+    path('birthday-cakes/', hot_views.birthday_cakes, name='birthday_cakes'),
+    path('wedding-cakes/', hot_views.wedding_cakes, name='wedding_cakes'),
+    path('treats/', hot_views.treats, name='treats'),
+    path('products/', hot_views.products, name='products'),
+    path('search/', views.search, name='search'),
+    path('contact/', hot_views.contact, name='contact'),
 
     # Authentication URLs
     path('accounts/register/', views.register_view, name='register'),
@@ -34,7 +42,9 @@ urlpatterns = [
          name='password_reset_complete'),
 
     # Order URLs (replace cart URLs)
-    path('place-order/', views.place_order, name='place_order'),
+    path('place-order/', hot_views.place_order, name='place_order'),
+    path('checkout/', views.checkout, name='checkout'),
+    path('slots/', views.slot_availability, name='slot_availability'),
     path('order-confirmation/<str:order_number>/',
          views.order_confirmation, name='order_confirmation'),
     path('orders/', views.order_history, name='order_history'),
@@ -42,5 +52,13 @@ urlpatterns = [
          name='order_detail'),
     path('orders/<str:order_number>/confirmation/',
          views.order_confirmation, name='order_confirmation'),
+    path('orders/<str:order_number>/events', hot_views.order_events,
+         name='order_events'),
     path('order-history/', views.order_history, name='order_history'),
+
+    # Staff reporting
+    path('dashboard/sales/', views.sales_dashboard, name='sales_dashboard'),
+
+    # Monitoring
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -2,35 +2,50 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.http import Http404
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
-from django.core.mail import send_mail
+from django.views.decorators.http import condition, require_http_methods
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 import json
 import logging
-from decimal import Decimal
-from datetime import datetime
+from datetime import timedelta
 import uuid
-import random
-import string
-from .models import Cake, Order, OrderItem, Customer
+from .models import ArchivedOrder, Cake, DailySales, Order
 from .forms import CustomUserCreationForm, ContactForm
-from django.db import models
+from .outbox import enqueue_email
+from .idempotency import idempotent_response
+from .order_logging import OrderTrace
+from .order_events import (
+    event_stream_response,
+    format_event,
+    status_event,
+)
+from .metrics import registry as metrics_registry
+from .catalogue import get_available_cakes
+from .search import ALLERGENS, parse_query, search_catalogue
+from .slots import SLOT_CHOICES, availability
+from .order_numbers import generate_order_number
+from .order_queries import customer_orders, find_order, keyset_page
+from .orders import (
+    OrderError, create_order, order_data, resolve_line_items,
+)
+from .conditional import (
+    catalogue_etag,
+    catalogue_last_modified,
+    order_etag,
+    order_last_modified,
+)
+from django.db import models, transaction
 
 logger = logging.getLogger(__name__)
 
 
-def generate_order_number():
-    """Generate a unique order number"""
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    random_chars = ''.join(random.choices(string.digits, k=4))
-    return f"MC{timestamp}{random_chars}"
-
 # Existing page views
 
 
@@ -38,35 +53,64 @@ def home(request):
     return render(request, 'cakes/home.html')
 
 
+@condition(etag_func=catalogue_etag,
+           last_modified_func=catalogue_last_modified)
 def birthday_cakes(request):
     """Display birthday cakes from database"""
-    cakes = Cake.objects.filter(category='birthday', is_available=True)
+    cakes = get_available_cakes('birthday')
     return render(request, 'cakes/birthday_cakes.html', {'cakes': cakes})
 
 
+@condition(etag_func=catalogue_etag,
+           last_modified_func=catalogue_last_modified)
 def wedding_cakes(request):
     """Display wedding cakes from database"""
-    cakes = Cake.objects.filter(category='wedding', is_available=True)
+    cakes = get_available_cakes('wedding')
     return render(request, 'cakes/wedding_cakes.html', {'cakes': cakes})
 
 
+@condition(etag_func=catalogue_etag,
+           last_modified_func=catalogue_last_modified)
 def vegan_cakes(request):
     """Display vegan cakes from database"""
-    cakes = Cake.objects.filter(category='vegan', is_available=True)
+    cakes = get_available_cakes('vegan')
     return render(request, 'cakes/vegan_cakes.html', {'cakes': cakes})
 
 
+@condition(etag_func=catalogue_etag,
+           last_modified_func=catalogue_last_modified)
 def treats(request):
     """Display treats from database"""
-    cakes = Cake.objects.filter(category='treats', is_available=True)
+    cakes = get_available_cakes('treats')
     return render(request, 'cakes/treats.html', {'cakes': cakes})
 
 
+@condition(etag_func=catalogue_etag,
+           last_modified_func=catalogue_last_modified)
 def products(request):
     """Display all products"""
-    cakes = Cake.objects.filter(is_available=True)
+    cakes = get_available_cakes()
     return render(request, 'cakes/products.html', {'cakes': cakes})
 
+
+def search(request):
+    """Ranked catalogue search, "no nuts" style phrases exclude allergens"""
+    query = request.GET.get('q', '').strip()
+    text, excluded = parse_query(query)
+    excluded.update(
+        key for key in request.GET.getlist('exclude') if key in ALLERGENS)
+
+    cakes = None
+    if text or excluded:
+        cakes = search_catalogue(text, excluded)[
+            :settings.SEARCH_RESULTS_LIMIT]
+    return render(request, 'cakes/search.html', {
+        'query': query,
+        'cakes': cakes,
+        'allergens': ALLERGENS,
+        'excluded': excluded,
+    })
+
 # Authentication views
 
 
@@ -91,135 +135,287 @@ def register_view(request):
 # Order processing views
 
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def place_order(request):
-    print(f"🔧 place_order view called - Method: {request.method}")
-    print(f"🔧 User authenticated: {request.user.is_authenticated}")
-
-    try:
-        # Parse JSON data
-        data = json.loads(request.body)
-        print(f"🔧 Parsed data: {data}")
-
-        # Parse dates properly
-        collection_date = None
-        if data.get('collection_date'):
-            collection_date = parse_date(data['collection_date'])
-            print(f"🔧 Parsed collection_date: {collection_date}")
-
-        delivery_date = None
-        if data.get('delivery_date'):
-            delivery_date = parse_date(data['delivery_date'])
-            print(f"🔧 Parsed delivery_date: {delivery_date}")
-
-        # Create order with parsed dates
-        order = Order.objects.create(
-            customer=request.user if request.user.is_authenticated else None,
-            customer_email=data['customer_email'],
-            order_number=generate_order_number(),
-            order_type=data['delivery_option'],
-            total=Decimal(str(data['cake_price'])),
-            special_instructions=data.get('special_instructions', ''),
-
-            # Collection fields with parsed date
-            collection_date=collection_date,
-            collection_time=data.get('collection_time', ''),
-
-            # Delivery fields with parsed date
-            delivery_address=data.get('delivery_address', ''),
-            delivery_city=data.get('delivery_city', ''),
-            delivery_postcode=data.get('delivery_postcode', ''),
-            delivery_date=delivery_date,
-            delivery_time=data.get('delivery_time', ''),
+def submit_order(request, data, items, trace):
+    """
+    Create an order from ``items`` and queue its confirmation email.
+
+    Shared by the sync and async order views. It uses the ORM, so async
+    callers must run it through ``sync_to_async``.
+    """
+    with trace.span('create'):
+        line_items = resolve_line_items(items)
+        order = create_order(
+            request.user if request.user.is_authenticated else None,
+            data,
+            line_items,
+            generate_order_number(),
         )
 
-        # Create order item
-        OrderItem.objects.create(
-            order=order,
-            cake_name=data['cake_name'],
-            cake_price=Decimal(str(data['cake_price'])),
-            quantity=1,
-            total_price=Decimal(str(data['cake_price'])),
-        )
-
-        # Send confirmation email
+    # Queue confirmation email, the outbox worker sends it
+    with trace.span('email'):
         try:
-            send_order_confirmation_email(order)
-            print(f"Order confirmation email sent for {order.order_number}")
+            queue_order_confirmation_email(order)
         except Exception as email_error:
-            print(f"Email sending failed: {email_error}")
+            trace.warning(
+                'Email queueing failed',
+                order_number=order.order_number,
+                error=str(email_error),
+            )
+
+    trace.success(
+        order_number=order.order_number,
+        order_type=order.order_type,
+        items=len(line_items),
+    )
+    return order
 
-        return JsonResponse({
-            'success': True,
-            'order_number': order.order_number,
-            'message': 'Order placed successfully!'
-        })
 
-    except json.JSONDecodeError:
+def order_error_response(trace, error):
+    """JSON response for an exception raised while placing an order"""
+    if isinstance(error, json.JSONDecodeError):
+        trace.rejected('invalid_json')
         return JsonResponse(
             {'success': False, 'error': 'Invalid JSON data'}, status=400)
-    except Exception as e:
-        print(f"Error creating order: {e}")
-        import traceback
-        traceback.print_exc()
+    if isinstance(error, OrderError):
+        trace.rejected(str(error))
+        return JsonResponse(
+            {'success': False, 'error': str(error)}, status=400)
+    if isinstance(error, KeyError):
+        trace.rejected(f'missing_{error.args[0]}')
         return JsonResponse(
-            {'success': False, 'error': 'Failed to create order'}, status=500)
+            {'success': False, 'error': f'Missing field: {error.args[0]}'},
+            status=400)
+    trace.error()
+    return JsonResponse(
+        {'success': False, 'error': 'Failed to create order'}, status=500)
+
+
+def single_item(data):
+    """place_order takes one cake, priced from the Cake table"""
+    return [{'cake_id': data.get('cake_id'), 'quantity': 1}]
+
+
+def place_order_response(request):
+    trace = OrderTrace(request, 'place_order')
+    try:
+        with trace.span('parse'):
+            data = order_data(json.loads(request.body))
+        order = submit_order(request, data, single_item(data), trace)
+    except Exception as e:
+        return order_error_response(trace, e)
+
+    return JsonResponse({
+        'success': True,
+        'order_number': order.order_number,
+        'message': 'Order placed successfully!'
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def place_order(request):
+    """
+    Place a single cake order. Send an ``Idempotency-Key`` header to make
+    retries safe, see cakes.idempotency.
+    """
+    return idempotent_response(request, 'place_order', place_order_response)
+
+
+@require_http_methods(["GET"])
+def slot_availability(request):
+    """
+    Free collection/delivery slots as JSON, e.g.
+    ``/slots/?type=collection&start=2025-06-01&days=14``.
+    """
+    order_type = request.GET.get('type', 'collection')
+    if order_type not in SLOT_CHOICES:
+        return JsonResponse({'error': 'Invalid type'}, status=400)
+    try:
+        start = parse_date(request.GET.get('start', ''))
+        days = int(request.GET.get('days', 14))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid start or days'}, status=400)
+    if not 1 <= days <= settings.SLOT_AVAILABILITY_MAX_DAYS:
+        return JsonResponse({
+            'error': (
+                f'days must be between 1 and '
+                f'{settings.SLOT_AVAILABILITY_MAX_DAYS}'
+            )
+        }, status=400)
+
+    return JsonResponse({
+        'type': order_type,
+        'slots': availability(
+            order_type, start or timezone.localdate(), days),
+    })
+
+
+@require_http_methods(["POST"])
+def checkout(request):
+    """
+    Place a multi item order from the cart.
+
+    Expects the same JSON fields as place_order plus
+    ``items: [{"cake_id": 1, "quantity": 2}, ...]``, and honours the same
+    ``Idempotency-Key`` header.
+    """
+    return idempotent_response(request, 'checkout', checkout_response)
+
+
+def checkout_response(request):
+    trace = OrderTrace(request, 'checkout')
+    try:
+        with trace.span('parse'):
+            data = order_data(json.loads(request.body))
+        order = submit_order(request, data, data.get('items'), trace)
+    except Exception as e:
+        return order_error_response(trace, e)
+
+    return JsonResponse({
+        'success': True,
+        'order_number': order.order_number,
+        'total': str(order.total),
+        'message': 'Order placed successfully!'
+    })
 
 
 @login_required
 def order_history(request):
-    """Display user's order history"""
-    orders = Order.objects.filter(
-        customer=request.user
-    ).prefetch_related(
-        'items'
-    ).order_by('-created_at')
-    return render(request, 'cakes/order_history.html', {'orders': orders})
+    """Display user's order history, one keyset page at a time"""
+    cursor = request.GET.get('after')
+    orders, next_cursor = keyset_page(
+        customer_orders(request.user),
+        cursor,
+        settings.ORDER_HISTORY_PAGE_SIZE,
+        merge_with=[customer_orders(request.user, ArchivedOrder)],
+    )
+    return render(request, 'cakes/order_history.html', {
+        'orders': orders,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+    })
 
 
 @login_required
+@condition(etag_func=order_etag, last_modified_func=order_last_modified)
 def order_detail(request, order_number):
-    """Display detailed view of a specific order"""
-    order = get_object_or_404(
-        Order,
-        order_number=order_number,
-        customer=request.user)
+    """Display detailed view of a specific order, live or archived"""
+    order = find_order(order_number=order_number, customer=request.user)
+    if order is None:
+        raise Http404
     return render(request, 'cakes/order_detail.html', {'order': order})
 
 
 @login_required
+@condition(etag_func=order_etag, last_modified_func=order_last_modified)
 def order_confirmation(request, order_number):
-    try:
-        order = Order.objects.get(
-            order_number=order_number,
-            customer=request.user
-        )
-        return render(request, 'cakes/order_confirmation.html', {
-            'order': order
-        })
-    except Order.DoesNotExist:
+    order = find_order(order_number=order_number, customer=request.user)
+    if order is None:
         messages.error(request, 'Order not found.')
         return redirect('home')
+    return render(request, 'cakes/order_confirmation.html', {
+        'order': order
+    })
+
+
+@require_http_methods(["GET"])
+def order_events(request, order_number):
+    """
+    The order's status as a single Server-Sent Event. A stream would hold
+    a WSGI worker per customer, so the browser is told to reconnect every
+    ORDER_EVENTS_POLL_MS instead. Under ASGI cakes.async_views streams the
+    changes as they happen.
+    """
+    if not request.user.is_authenticated:
+        return HttpResponseForbidden()
+    order = get_object_or_404(
+        Order.objects.only('order_number', 'status', 'updated_at'),
+        order_number=order_number,
+        customer=request.user)
+    return event_stream_response([format_event(
+        status_event(order.order_number, order.status, order.updated_at),
+        retry=settings.ORDER_EVENTS_POLL_MS)])
+
+
+def metrics(request):
+    """Per-view request metrics in Prometheus text format"""
+    local = request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+    if not (local or request.user.is_staff):
+        raise Http404
+    return HttpResponse(
+        metrics_registry.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+@staff_member_required
+def sales_dashboard(request):
+    """
+    Revenue per category per day and the month's top cakes, read from the
+    DailySales rollup so the cost depends on the range shown, not on the
+    order history.
+    """
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 30
+    days = min(max(days, 1), 366)
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    categories = Cake.CATEGORY_CHOICES
+
+    revenue = {}
+    for row in (
+            DailySales.objects.filter(date__range=(start, today))
+            .values('date', 'category')
+            .annotate(total=models.Sum('revenue'))
+            .order_by()):
+        revenue[(row['date'], row['category'])] = row['total']
+
+    daily = []
+    for offset in range(days):
+        date = today - timedelta(days=offset)
+        amounts = [revenue.get((date, key), 0) for key, _ in categories]
+        daily.append({
+            'date': date,
+            'amounts': amounts,
+            'total': sum(amounts) + revenue.get((date, ''), 0),
+        })
 
-
-def contact(request):
-    """Display contact page with form"""
-    if request.method == 'POST':
-        form = ContactForm(request.POST)
-        if form.is_valid():
-            # Get form data
-            name = form.cleaned_data['name']
-            email = form.cleaned_data['email']
-            phone = form.cleaned_data.get('phone', 'Not provided')
-            subject = form.cleaned_data['subject']
-            message = form.cleaned_data['message']
-            event_date = form.cleaned_data.get('event_date', 'Not specified')
-
-            # Create email content
-            subject_display = dict(form.SUBJECT_CHOICES)[subject]
-            email_subject = f"Contact Form: {subject_display}"
-            email_message = f"""
+    top_cakes = (
+        DailySales.objects.filter(date__range=(today.replace(day=1), today))
+        .values('cake_name')
+        .annotate(
+            orders=models.Sum('orders'),
+            quantity=models.Sum('quantity'),
+            revenue=models.Sum('revenue'),
+        )
+        .order_by('-revenue')[:10]
+    )
+
+    return render(request, 'cakes/sales_dashboard.html', {
+        'days': days,
+        'categories': [label for _, label in categories],
+        'daily': daily,
+        'range_total': sum(day['total'] for day in daily),
+        'top_cakes': top_cakes,
+    })
+
+
+def queue_contact_emails(form):
+    """Queue the business notification and customer confirmation emails"""
+    # Get form data
+    name = form.cleaned_data['name']
+    email = form.cleaned_data['email']
+    phone = form.cleaned_data.get('phone', 'Not provided')
+    subject = form.cleaned_data['subject']
+    message = form.cleaned_data['message']
+    event_date = form.cleaned_data.get('event_date', 'Not specified')
+
+    # Create email content
+    subject_display = dict(form.SUBJECT_CHOICES)[subject]
+    email_subject = f"Contact Form: {subject_display}"
+    email_message = f"""
 New contact form submission from Mamma's Cakes website:
 
 Name: {name}
@@ -233,23 +429,11 @@ Message:
 
 ---
 This message was sent from the Mamma's Cakes contact form.
-            """
+    """
 
-            try:
-                # Send email to business
-                send_mail(
-                    subject=email_subject,
-                    message=email_message,
-                    from_email=email,
-                    recipient_list=['mammas.cakes16@gmail.com'],
-                    fail_silently=False,
-                )
-
-                # Send confirmation email to customer
-                confirmation_subject = (
-                    "Thank you for contacting Mamma's Cakes!"
-                )
-                confirmation_message = f"""
+    # Confirmation email to customer
+    confirmation_subject = "Thank you for contacting Mamma's Cakes!"
+    confirmation_message = f"""
 Dear {name},
 
 Thank you for contacting Mamma's Cakes!
@@ -266,60 +450,77 @@ The Mamma's Cakes Team
 Phone: 07920554000
 Email: info@mammascakes.com
 Address: Moore Court, Howard Road, Edgware, HA7 1FA
-                """
-
-                send_mail(
-                    subject=confirmation_subject,
-                    message=confirmation_message,
-                    from_email='mammas.cakes16@gmail.com',
-                    recipient_list=[email],
-                    fail_silently=True,
-                )
-
-                messages.success(
-                    request,
-                    'Thank you! Your message has been sent successfully. '
-                    'We will get back to you within 24 hours.'
-                )
-                form = ContactForm()  # Reset form after successful submission
+    """
+
+    with transaction.atomic():
+        # Queue email to business
+        enqueue_email(
+            subject=email_subject,
+            body=email_message,
+            from_email=email,
+            recipient_list=['mammas.cakes16@gmail.com'],
+        )
+        enqueue_email(
+            subject=confirmation_subject,
+            body=confirmation_message,
+            from_email='mammas.cakes16@gmail.com',
+            recipient_list=[email],
+        )
 
-            except Exception as e:
-                print(f"Error sending contact email: {e}")
-                error_message = (
-                    'Sorry, there was an error sending your message. '
-                    'Please try again or call us directly at 07920554000.'
-                )
-                messages.error(request, error_message)
-    else:
-        form = ContactForm()
 
-    context = {
+CONTACT_SUCCESS_MESSAGE = (
+    'Thank you! Your message has been sent successfully. '
+    'We will get back to you within 24 hours.'
+)
+CONTACT_ERROR_MESSAGE = (
+    'Sorry, there was an error sending your message. '
+    'Please try again or call us directly at 07920554000.'
+)
+
+
+def contact_context(form):
+    return {
         'form': form,
         'page_title': 'Contact Us',
         'page_description': 'Get in touch for custom orders and inquiries'
     }
 
-    return render(request, 'cakes/contact.html', context)
 
+def contact(request):
+    """Display contact page with form"""
+    if request.method == 'POST':
+        form = ContactForm(request.POST)
+        if form.is_valid():
+            try:
+                queue_contact_emails(form)
+                messages.success(request, CONTACT_SUCCESS_MESSAGE)
+                form = ContactForm()  # Reset form after successful submission
+            except Exception as e:
+                logger.error(f"Error queueing contact email: {e}")
+                messages.error(request, CONTACT_ERROR_MESSAGE)
+    else:
+        form = ContactForm()
 
-def send_order_confirmation_email(order):
-    """Send order confirmation email to customer"""
-    try:
-        subject = f'Order Confirmation - {order.order_number}'
+    return render(request, 'cakes/contact.html', contact_context(form))
 
-        if order.customer:
-            customer_name = order.customer.first_name or order.customer.username
-        else:
-            customer_name = order.customer_email or "Customer"
 
-        html_message = render_to_string(
-            'emails/order_confirmation.html',
-            {
-                'order': order,
-                'customer_name': customer_name,
-            })
+def queue_order_confirmation_email(order):
+    """Queue the order confirmation email in the outbox"""
+    subject = f'Order Confirmation - {order.order_number}'
+
+    if order.customer:
+        customer_name = order.customer.first_name or order.customer.username
+    else:
+        customer_name = order.customer_email or "Customer"
+
+    html_message = render_to_string(
+        'emails/order_confirmation.html',
+        {
+            'order': order,
+            'customer_name': customer_name,
+        })
 
-        plain_message = f"""
+    plain_message = f"""
         Dear {customer_name},
 
         Thank you for your order!
@@ -333,19 +534,10 @@ def send_order_confirmation_email(order):
         Mammas Cakes Team
         """
 
-        send_mail(
-            subject,
-            plain_message,
-            settings.DEFAULT_FROM_EMAIL,
-            [order.customer_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        logger.info(f"Confirmation email sent for order {order.order_number}")
-    except Exception as e:
-        error_msg = (
-            f"Failed to send confirmation email for order "
-            f"{order.order_number}: {e}"
-        )
-        logger.error(error_msg)
-        raise
+    enqueue_email(
+        subject,
+        plain_message,
+        [order.customer_email],
+        html_body=html_message,
+    )
+    logger.info(f"Confirmation email queued for order {order.order_number}")
@@ -0,0 +1,18 @@
+"""
+Django settings for mammas_cakes project.
+
+DJANGO_SETTINGS_MODULE stays ``mammas_cakes.settings``. env.py (if there
+is one) is imported once, here, before choosing between the development
+settings (DEVELOPMENT is set) and the production settings.
+"""
+import os
+
+try:
+    import env  # noqa: F401 - only sets os.environ
+except ImportError:
+    pass
+
+if 'DEVELOPMENT' in os.environ:
+    from .development import *  # noqa: F401,F403
+else:
+    from .production import *  # noqa: F401,F403
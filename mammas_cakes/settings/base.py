@@ -0,0 +1,391 @@
+"""
+Settings shared by the production and development settings.
+
+Generated by 'django-admin startproject' using Django 4.0. Nothing here
+prints or reads files, env.py is loaded once by the package __init__.
+"""
+from pathlib import Path
+import os
+import tempfile
+import dj_database_url
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get('SECRET_KEY',
+                            'fallback-secret-key-for-development')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'cakes',  # Add your cakes app here
+    'cloudinary',
+    'cloudinary_storage'
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # Add this line
+    'cakes.middleware.RequestMetricsMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'mammas_cakes.urls'
+
+TEMPLATES = [
+    {
+        # DjangoTemplates that also times renders for the request metrics
+        'BACKEND': 'cakes.metrics.InstrumentedDjangoTemplates',
+        'DIRS': [
+            # Also look in project templates if you create any
+            os.path.join(BASE_DIR, 'templates'),
+        ],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'django.template.context_processors.media',
+            ],
+        },
+    },
+]
+
+
+WSGI_APPLICATION = 'mammas_cakes.wsgi.application'
+
+# Serve place_order, the catalogue pages and contact with async views.
+# Only turn this on for the ASGI deployment (see README), under WSGI every
+# async view pays for an event loop hop.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False').lower() == 'true'
+
+# Caches - the catalogue alias holds the category listings, the sessions
+# alias holds sessions and cached users. Both have to be shared by every
+# worker on every dyno: a per-process cache keeps serving a session after
+# logout, or a user after their password changed, in the other workers.
+# Set CACHE_URL to the Redis add-on's redis:// URL in production.
+#
+# Without CACHE_URL the sessions alias falls back to a per-process
+# LocMemCache, so SESSION_STRATEGY defaults to db and a cached user can be
+# up to USER_CACHE_TIMEOUT seconds stale in the other workers. The
+# catalogue falls back to a FileBasedCache in the dyno's temp dir (one
+# file per listing read from disk on every hit, per dyno); stale copies
+# are harmless there because the keys carry the catalogue version.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'catalogue': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'catalogue',
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'sessions',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'catalogue': {
+            'BACKEND': os.environ.get(
+                'CATALOGUE_CACHE_BACKEND',
+                'django.core.cache.backends.filebased.FileBasedCache'
+            ),
+            'LOCATION': os.environ.get(
+                'CATALOGUE_CACHE_LOCATION',
+                os.path.join(tempfile.gettempdir(), 'mammas_cakes_catalogue')
+            ),
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'mammas_cakes_sessions',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+# None keeps listings until a Cake change invalidates them
+CATALOGUE_CACHE_TIMEOUT = None
+
+# Sessions - SESSION_STRATEGY is cached_db (sessions cache in front of the
+# database, the default with CACHE_URL), db (Django's default, and ours
+# without a shared cache) or signed_cookies (no session queries at all,
+# but sessions can't be ended server side and the cookie is limited to
+# ~4KB)
+SESSION_STRATEGY = os.environ.get(
+    'SESSION_STRATEGY', 'cached_db' if CACHE_URL else 'db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STRATEGY}'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# With a shared cache, request.user comes from the sessions cache instead
+# of an auth_user query. Without one it is left to ModelBackend: a
+# per-process cache would keep a changed password, a deactivated account
+# or revoked staff rights working in the other workers for up to
+# USER_CACHE_TIMEOUT. ModelBackend stays listed so sessions logged in
+# before the switch keep working.
+AUTHENTICATION_BACKENDS = [
+    'django.contrib.auth.backends.ModelBackend',
+]
+if CACHE_URL:
+    AUTHENTICATION_BACKENDS.insert(
+        0, 'cakes.auth_backends.CachedModelBackend')
+USER_CACHE_ALIAS = 'sessions'
+USER_CACHE_TIMEOUT = 300
+
+# DATABASES = {
+        #'default': {
+         #   'ENGINE': 'django.db.backends.sqlite3',
+           # 'NAME': BASE_DIR / 'db.sqlite3',
+        # }
+# }
+
+# Keep connections open between requests (seconds, 0 closes them after
+# every request) and check they still work before reusing them. Ignored
+# with ASYNC_VIEWS: under ASGI each request's sync work can run on a new
+# thread, and per thread connections would pile up until PostgreSQL runs
+# out, so they are closed after every request and DB_POOL_MAX_SIZE is the
+# way to reuse them.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+DB_CONN_HEALTH_CHECKS = (
+    os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true'
+)
+# Setting DB_POOL_MAX_SIZE switches to an in-process connection pool for
+# the threaded/ASGI deployment, connections then go back to the pool
+# after each request instead of being held per thread. A request waits
+# up to DB_POOL_TIMEOUT seconds for a connection when all are in use.
+# psycopg2 closes returned connections above DB_POOL_MIN_SIZE, so it
+# defaults to the maximum: a smaller minimum brings back a handshake per
+# request whenever more requests than that run at once.
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))
+DB_POOL_MIN_SIZE = min(
+    int(os.environ.get('DB_POOL_MIN_SIZE', DB_POOL_MAX_SIZE)),
+    DB_POOL_MAX_SIZE,
+)
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+
+def database_settings(url):
+    """Build DATABASES from a database URL (production and development
+    only differ in where the URL comes from)"""
+    persistent = not (DB_POOL_MAX_SIZE or ASYNC_VIEWS)
+    default = dj_database_url.parse(
+        url,
+        conn_max_age=DB_CONN_MAX_AGE if persistent else 0,
+    )
+    default['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+    if DB_POOL_MAX_SIZE:
+        default.update({
+            'ENGINE': 'cakes.db.pooled_postgresql',
+            'POOL_MIN_SIZE': DB_POOL_MIN_SIZE,
+            'POOL_MAX_SIZE': DB_POOL_MAX_SIZE,
+            'POOL_TIMEOUT': DB_POOL_TIMEOUT,
+        })
+    return {'default': default}
+
+
+CSRF_TRUSTED_ORIGINS = [
+    "https://*.codeinstitute-ide.net/",
+    "https://*.herokuapp.com"
+]
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': (
+            'django.contrib.auth.password_validation.'
+            'UserAttributeSimilarityValidator'
+        ),
+    },
+    {
+        'NAME': (
+            'django.contrib.auth.password_validation.'
+            'MinimumLengthValidator'
+        ),
+    },
+    {
+        'NAME': (
+            'django.contrib.auth.password_validation.'
+            'CommonPasswordValidator'
+        ),
+    },
+    {
+        'NAME': (
+            'django.contrib.auth.password_validation.'
+            'NumericPasswordValidator'
+        ),
+    },
+]
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.0/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.0/howto/static-files/
+
+STATIC_URL = 'static/'
+# Sources, including the build_assets output, live in static/ and
+# collectstatic writes the hashed and compressed copies to staticfiles/
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+CLOUDINARY_URL = os.environ.get('CLOUDINARY_URL')
+# Media files
+MEDIA_URL = '/media/'
+# Points to your images folder
+MEDIA_ROOT = os.path.join(BASE_DIR, 'documents')
+DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Authentication settings
+LOGIN_URL = '/accounts/login/'
+LOGIN_REDIRECT_URL = '/'
+LOGOUT_REDIRECT_URL = '/'
+
+# Orders shown per page in the order history
+ORDER_HISTORY_PAGE_SIZE = 20
+
+# Completed and cancelled orders older than this are moved to the archive
+# by `python manage.py archive_orders` (see cakes/archive.py)
+ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', 365))
+
+# Admin changelists with more rows than this show PostgreSQL's estimated
+# count instead of running COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+# Orders held in memory at once while exporting (see cakes.exports)
+EXPORT_CHUNK_SIZE = 500
+
+# Most results shown by /search/
+SEARCH_RESULTS_LIMIT = 48
+
+# Collection/delivery slots - orders per slot per day unless a
+# SlotCapacity row says otherwise, how many days ahead the first bookable
+# day is, and the longest range /slots/ answers for
+SLOT_DEFAULT_CAPACITY = 10
+SLOT_MIN_LEAD_DAYS = 1
+SLOT_AVAILABILITY_MAX_DAYS = 60
+
+# Most of one cake a single order line can ask for
+ORDER_MAX_QUANTITY = 50
+
+# Email settings - Use environment variables
+EMAIL_BACKEND = os.environ.get(
+    'EMAIL_BACKEND',
+    'django.core.mail.backends.smtp.EmailBackend'
+)
+EMAIL_HOST = 'smtp.gmail.com'
+EMAIL_PORT = 587
+EMAIL_USE_TLS = True
+EMAIL_HOST_USER = os.environ.get(
+    'EMAIL_HOST_USER', ''
+)
+EMAIL_HOST_PASSWORD = os.environ.get(
+    'EMAIL_HOST_PASSWORD', ''
+)
+DEFAULT_FROM_EMAIL = (
+    f"Mamma's Cakes <{os.environ.get('EMAIL_HOST_USER', '')}>"
+)
+
+# Email outbox - drained by `python manage.py send_queued_emails --loop`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(
+    os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+)
+EMAIL_OUTBOX_RETRY_SECONDS = int(
+    os.environ.get('EMAIL_OUTBOX_RETRY_SECONDS', 60)
+)
+
+# How long a place_order/checkout Idempotency-Key is remembered, see
+# cakes/idempotency.py
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 24 * 3600))
+
+# Live order status (cakes/order_events.py). Streams send a comment every
+# HEARTBEAT seconds and end after MAX_SECONDS, then the browser reconnects
+# after RETRY_MS. Under WSGI there is no stream and it polls every POLL_MS.
+ORDER_EVENTS_HEARTBEAT_SECONDS = 15
+ORDER_EVENTS_MAX_SECONDS = int(os.environ.get('ORDER_EVENTS_MAX_SECONDS', 300))
+ORDER_EVENTS_RETRY_MS = 3000
+ORDER_EVENTS_POLL_MS = int(os.environ.get('ORDER_EVENTS_POLL_MS', 30000))
+
+
+# Request metrics - /metrics is served to staff and INTERNAL_IPS only
+INTERNAL_IPS = ['127.0.0.1']
+VIEW_QUERY_BUDGETS = {
+    'home': 2,
+    'birthday_cakes': 4,
+    'wedding_cakes': 4,
+    'vegan_cakes': 4,
+    'treats': 4,
+    'products': 4,
+    'search': 4,
+    'slot_availability': 4,
+    'place_order': 22,
+    'checkout': 22,
+    'order_history': 4,
+    'order_detail': 6,
+    'order_confirmation': 6,
+    'sales_dashboard': 6,
+    'order_events': 3,
+}
+QUERY_BUDGET_RAISE = False
+
+# cakes.metrics logs a warning when a view goes over its query budget, set
+# METRICS_LOG_LEVEL=DEBUG to also log a JSON line for every request.
+# Fraction of successful orders logged on cakes.orders (failures always are)
+ORDER_LOG_SAMPLE_RATE = float(os.environ.get('ORDER_LOG_SAMPLE_RATE', 0.1))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+        },
+    },
+    "root": {
+        "handlers": ["console"],
+        "level": "WARNING",
+    },
+    "loggers": {
+        "cakes.metrics": {
+            "level": os.environ.get("METRICS_LOG_LEVEL", "INFO"),
+        },
+        "cakes.orders": {
+            "level": os.environ.get("ORDER_LOG_LEVEL", "INFO"),
+        },
+    },
+}
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""
+Local development settings, used when DEVELOPMENT is set (usually in
+env.py). Falls back to SQLite when there is no DATABASE_URL.
+"""
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
+
+ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+DATABASES = database_settings(os.environ.get(
+    "DATABASE_URL", f"sqlite:///{BASE_DIR / 'db.sqlite3'}"
+))
@@ -0,0 +1,23 @@
+"""
+Production settings, used on Heroku.
+"""
+from .base import *  # noqa: F401,F403
+
+ALLOWED_HOSTS = ['mammas-cakes-6684e9538d47.herokuapp.com']
+
+DATABASES = database_settings(os.environ.get("DATABASE_URL"))
+
+STATICFILES_STORAGE = 'cakes.storage.MinifiedManifestStaticFilesStorage'
+# A missing file keeps its plain URL instead of failing the page
+WHITENOISE_MANIFEST_STRICT = False
+
+# Security settings for production
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SECURE_SSL_REDIRECT = True
+SECURE_BROWSER_XSS_FILTER = True
+SECURE_CONTENT_TYPE_NOSNIFF = True
+SECURE_HSTS_SECONDS = 31536000
+SECURE_HSTS_INCLUDE_SUBDOMAINS = True
+SECURE_HSTS_PRELOAD = True
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True